@@ -0,0 +1,202 @@
+# Bitmap fonts stored in one bytes object, used by tft.ST7735 and ssd1306.SSD1306
+#
+# format:
+#   header      b"FN", height, code of first character, number of characters
+#   index       3 bytes per character: offset of glyph data (little endian) and width
+#   glyph data  ceil(height / 8) pages of width bytes (framebuf MONO_VLSB layout),
+#               bit 0 of a byte is the upper pixel of its page
+#
+# Glyphs are found by their position in the index, so the lookup needs no branching.
+# Characters outside the font are shown with the first glyph.
+
+HEADER_SIZE = 5
+INDEX_ENTRY_SIZE = 3
+
+
+class Font:
+    """
+    bitmap font with fixed height and fixed or proportional width
+    """
+    
+    def __init__(self, data):
+        """
+        data - font in the bytes format, e.g. a bytes literal of a frozen module
+        """
+        if bytes(data[0:2]) != b"FN":
+            raise ValueError("Data is not a font!")
+        self._data = memoryview(data)
+        self._file = None
+        self._readHeader(data[:HEADER_SIZE])
+        self._index = self._data[HEADER_SIZE:self._glyphStart]
+        self.width = max(self._index[i] for i in range(2, len(self._index), INDEX_ENTRY_SIZE))
+        
+        
+    @classmethod
+    def load(cls, path, stream = False):
+        """
+        load font from a file
+        path - path of the font file
+        stream - keep only the index in RAM and read glyphs from the file when they are needed
+        """
+        if not stream:
+            with open(path, "rb") as file:
+                return cls(file.read())
+        font = cls.__new__(cls)
+        file = open(path, "rb")
+        header = file.read(HEADER_SIZE)
+        if header[0:2] != b"FN":
+            file.close()
+            raise ValueError("File is not a font!")
+        font._data = None
+        font._file = file
+        font._readHeader(header)
+        font._index = memoryview(file.read(font._glyphStart - HEADER_SIZE))
+        font.width = max(font._index[i] for i in range(2, len(font._index), INDEX_ENTRY_SIZE))
+        return font
+    
+    
+    def _readHeader(self, header):
+        """
+        read height and character range from the header
+        """
+        self.height = header[2]
+        self.first = header[3]
+        self.count = header[4]
+        self.pages = (self.height + 7) // 8
+        self._glyphStart = HEADER_SIZE + self.count * INDEX_ENTRY_SIZE
+        
+        
+    def close(self):
+        """
+        close the font file of a streamed font
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            
+            
+    def glyph(self, char):
+        """
+        returns width and glyph data of a character
+        """
+        index = ord(char) - self.first
+        if index < 0 or index >= self.count:
+            index = 0
+        index *= INDEX_ENTRY_SIZE
+        width = self._index[index + 2]
+        start = self._glyphStart + (self._index[index] | (self._index[index + 1] << 8))
+        if self._file is None:
+            return width, self._data[start:start + width * self.pages]
+        self._file.seek(start)
+        return width, self._file.read(width * self.pages)
+    
+    
+    def charWidth(self, char):
+        """
+        returns width of a character in pixels
+        """
+        index = ord(char) - self.first
+        if index < 0 or index >= self.count:
+            index = 0
+        return self._index[index * INDEX_ENTRY_SIZE + 2]
+        
+        
+    def textWidth(self, text):
+        """
+        returns width of a string in pixels
+        """
+        width = 0
+        for char in text:
+            width += self.charWidth(char)
+        return width
+    
+    
+    def draw(self, framebuffer, text, x, y, colour = 1, bgColour = None):
+        """
+        draw string onto a framebuf.FrameBuffer, e.g. ssd1306.SSD1306, set pixels are drawn as vertical runs
+        framebuffer - FrameBuffer to draw on
+        x - x-coordinate of the upper left corner
+        y - y-coordinate of the upper left corner
+        colour - colour of the text
+        bgColour - colour of the background, None leaves the background unchanged
+        returns width of the string in pixels
+        """
+        start = x
+        for char in text:
+            width, data = self.glyph(char)
+            if bgColour is not None:
+                framebuffer.fill_rect(x, y, width, self.height, bgColour)
+            for column in range(width):
+                run = -1
+                for row in range(self.height + 1):
+                    if row < self.height and data[(row >> 3) * width + column] & (1 << (row & 7)):
+                        if run < 0:
+                            run = row
+                    elif run >= 0:
+                        framebuffer.vline(x + column, y + run, row - run, colour)
+                        run = -1
+            x += width
+        return x - start
+
+
+def encode(height, first, glyphs):
+    """
+    encode glyphs into the font format, can also be used on a PC to create font files
+    height - height of all glyphs in pixels
+    first - code of the first character
+    glyphs - list of (width, data) tuples in MONO_VLSB layout, one per character
+    returns font as bytes
+    """
+    index = bytearray()
+    data = bytearray()
+    offsets = {}
+    for width, glyph in glyphs:
+        glyph = bytes(glyph)
+        # identical glyphs share their data
+        if glyph not in offsets:
+            offsets[glyph] = len(data)
+            data += glyph
+        offset = offsets[glyph]
+        index += bytes((offset & 0xFF, offset >> 8, width))
+    return b"FN" + bytes((height, first, len(glyphs))) + bytes(index) + bytes(data)
+
+
+# 5x5 font of the TFT display for the characters 0 to 127
+FONT5X5 = Font(
+    b"\x46\x4e\x05\x00\x80\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00"
+    b"\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00"
+    b"\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00"
+    b"\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00\x00\x05\x00"
+    b"\x00\x05\x00\x00\x05\x05\x00\x05\x0a\x00\x05\x0f\x00\x05\x14\x00\x05\x19\x00\x05\x1e\x00\x05\x23"
+    b"\x00\x05\x28\x00\x05\x2d\x00\x05\x32\x00\x05\x37\x00\x05\x3c\x00\x05\x41\x00\x05\x46\x00\x05\x4b"
+    b"\x00\x05\x50\x00\x05\x55\x00\x05\x5a\x00\x05\x5f\x00\x05\x64\x00\x05\x69\x00\x05\x6e\x00\x05\x73"
+    b"\x00\x05\x78\x00\x05\x7d\x00\x05\x82\x00\x05\x87\x00\x05\x8c\x00\x05\x91\x00\x05\x96\x00\x05\x9b"
+    b"\x00\x05\x00\x00\x05\xa0\x00\x05\xa5\x00\x05\xaa\x00\x05\xaf\x00\x05\xb4\x00\x05\xb9\x00\x05\xbe"
+    b"\x00\x05\xc3\x00\x05\xc8\x00\x05\xcd\x00\x05\xd2\x00\x05\xd7\x00\x05\xdc\x00\x05\xe1\x00\x05\xe6"
+    b"\x00\x05\x55\x00\x05\xeb\x00\x05\xf0\x00\x05\xf5\x00\x05\xfa\x00\x05\xff\x00\x05\x04\x01\x05\x09"
+    b"\x01\x05\x0e\x01\x05\x13\x01\x05\x18\x01\x05\x1d\x01\x05\x22\x01\x05\x27\x01\x05\x2c\x01\x05\x31"
+    b"\x01\x05\x36\x01\x05\x3b\x01\x05\x40\x01\x05\x45\x01\x05\x4a\x01\x05\x4f\x01\x05\x54\x01\x05\x59"
+    b"\x01\x05\x5e\x01\x05\x63\x01\x05\x68\x01\x05\x6d\x01\x05\x72\x01\x05\x77\x01\x05\x7c\x01\x05\x81"
+    b"\x01\x05\x86\x01\x05\x8b\x01\x05\x90\x01\x05\x95\x01\x05\x9a\x01\x05\x9f\x01\x05\xa4\x01\x05\xa9"
+    b"\x01\x05\xae\x01\x05\xb3\x01\x05\xb8\x01\x05\xbd\x01\x05\xc2\x01\x05\xc7\x01\x05\xcc\x01\x05\xd1"
+    b"\x01\x05\x00\x00\x05\x02\x01\x15\x05\x02\x00\x00\x00\x00\x00\x00\x17\x00\x00\x00\x00\x03\x00\x03"
+    b"\x00\x0a\x1f\x0a\x1f\x0a\x0a\x17\x15\x1d\x0a\x13\x09\x04\x12\x19\x0a\x15\x15\x0a\x10\x00\x03\x00"
+    b"\x00\x00\x00\x0e\x11\x00\x00\x00\x11\x0e\x00\x00\x00\x0a\x04\x0a\x00\x00\x04\x0e\x04\x00\x00\x10"
+    b"\x08\x00\x00\x00\x04\x04\x04\x00\x00\x08\x00\x00\x00\x10\x08\x04\x02\x01\x0e\x11\x11\x0e\x00\x00"
+    b"\x12\x1f\x10\x00\x19\x15\x15\x12\x00\x09\x11\x15\x0b\x00\x0c\x0a\x09\x1f\x08\x17\x15\x15\x15\x09"
+    b"\x08\x14\x16\x15\x08\x11\x09\x05\x03\x01\x0a\x15\x15\x15\x0a\x02\x15\x0d\x05\x02\x00\x0a\x00\x00"
+    b"\x00\x00\x10\x0a\x00\x00\x00\x04\x0a\x11\x00\x00\x0a\x0a\x0a\x00\x00\x11\x0a\x04\x00\x0e\x11\x15"
+    b"\x09\x0e\x1e\x05\x05\x1e\x00\x1f\x15\x15\x0a\x00\x0e\x11\x11\x11\x00\x1f\x11\x11\x0e\x00\x1f\x15"
+    b"\x15\x11\x00\x1f\x05\x05\x01\x00\x0e\x11\x11\x15\x0c\x1f\x04\x04\x1f\x00\x11\x1f\x11\x00\x00\x09"
+    b"\x11\x11\x0f\x01\x1f\x04\x0a\x11\x00\x1f\x10\x10\x10\x00\x1f\x02\x04\x02\x1f\x1f\x02\x04\x08\x1f"
+    b"\x1f\x05\x05\x02\x00\x06\x09\x19\x16\x00\x1f\x05\x05\x0a\x10\x12\x15\x15\x09\x00\x01\x01\x1f\x01"
+    b"\x01\x0f\x10\x10\x0f\x00\x07\x08\x10\x08\x07\x1f\x08\x04\x08\x1f\x1b\x04\x04\x1b\x00\x01\x02\x1c"
+    b"\x02\x01\x19\x15\x13\x11\x00\x00\x1f\x11\x11\x00\x01\x02\x04\x08\x10\x00\x11\x11\x1f\x00\x00\x02"
+    b"\x01\x02\x00\x10\x10\x10\x10\x10\x00\x01\x02\x00\x00\x0c\x12\x12\x1e\x10\x1f\x14\x14\x08\x00\x0c"
+    b"\x12\x12\x12\x00\x08\x14\x14\x1f\x00\x0e\x15\x15\x12\x00\x04\x1e\x05\x01\x00\x02\x15\x15\x0f\x00"
+    b"\x1f\x04\x04\x18\x00\x00\x1d\x00\x00\x00\x00\x10\x10\x0d\x00\x1f\x04\x0a\x10\x00\x00\x0f\x10\x10"
+    b"\x00\x1e\x02\x04\x02\x1e\x1e\x02\x02\x1c\x00\x0c\x12\x12\x0c\x00\x1e\x0a\x0a\x04\x00\x04\x0a\x0a"
+    b"\x1e\x00\x1c\x02\x02\x02\x00\x10\x14\x0a\x02\x00\x00\x0f\x14\x14\x10\x0e\x10\x10\x1e\x10\x06\x08"
+    b"\x10\x08\x06\x1e\x10\x08\x10\x1e\x12\x0c\x0c\x12\x00\x12\x14\x08\x04\x02\x12\x1a\x16\x12\x00\x00"
+    b"\x04\x1f\x11\x00\x00\x1f\x00\x00\x00\x11\x1f\x04\x00\x00\x00\x04\x04\x08\x08"
+)
@@ -11,6 +11,8 @@ class I2CLCD:
         self.i2c = i2c
         
         self.i2c.writeto(self._addr, bytes([0x00, 0x00]))
+        # IOCON: disable sequential operation, so all bytes of one write go to the GPIO register
+        self.i2c.writeto(self._addr, bytes([0x05, 0x20]))
         self.backlight = 0x80
         self.registerSelect = 0x02
         self.en = 0x04
@@ -18,15 +20,52 @@ class I2CLCD:
         self.columns = 16
         self.rows = 2
         
+        # copy of the displayed characters and the cursor position, -1 while unknown
+        self._shadow = bytearray(b" " * (self.columns * self.rows))
+        self._cursorX = -1
+        self._cursorY = -1
+        
+        # GPIO register followed by the EN high/low pattern of queued bytes, 4 bytes each
+        self._burst = bytearray(1 + 4 * self.columns * self.rows)
+        self._burst[0] = 0x09
+        self._burstView = memoryview(self._burst)
+        self._burstLength = 1
+        
         
     def _write(self, data):
         """
-        making a write operation
+        making a write operation, the I2C transfer of each byte is longer than the enable pulse has to be
         """
-        self.i2c.writeto(self._addr, bytes([0x09, data | self.en]))
-        utime.sleep_us(1)
-        self.i2c.writeto(self._addr, bytes([0x09, data & ~self.en]))
-        utime.sleep_us(50)
+        self.i2c.writeto(self._addr, bytes([0x09, data | self.en, data & ~self.en]))
+        
+        
+    def _queue(self, data, is_data):
+        """
+        adding both nibbles of a byte to the burst buffer
+        """
+        if self._burstLength + 4 > len(self._burst):
+            self._flush()
+        flags = self.backlight
+        if is_data:
+            flags |= self.registerSelect
+        high = ((data >> 4) << 3) | flags
+        low = ((data & 0x0F) << 3) | flags
+        burst = self._burst
+        n = self._burstLength
+        burst[n] = high | self.en
+        burst[n + 1] = high
+        burst[n + 2] = low | self.en
+        burst[n + 3] = low
+        self._burstLength = n + 4
+        
+        
+    def _flush(self):
+        """
+        sending all queued bytes in one I2C write
+        """
+        if self._burstLength > 1:
+            self.i2c.writeto(self._addr, self._burstView[:self._burstLength])
+            self._burstLength = 1
         
         
     def _set(self, data, is_data):
@@ -43,8 +82,8 @@ class I2CLCD:
         """
         splitting data in two parts
         """
-        self._set(data >> 4, is_data)
-        self._set(data & 0x0F, is_data)
+        self._queue(data, is_data)
+        self._flush()
     
     def _command(self, data):
         """
@@ -77,6 +116,7 @@ class I2CLCD:
         utime.sleep_ms(2)
         self._command(0x06)
         self._command(0x0C) 
+        self._cleared()
     
     
     def clear(self):
@@ -85,6 +125,17 @@ class I2CLCD:
         """
         self._command(0x01)
         utime.sleep_ms(2)
+        self._cleared()
+        
+        
+    def _cleared(self):
+        """
+        shadow and cursor after a clear command
+        """
+        for i in range(len(self._shadow)):
+            self._shadow[i] = 0x20
+        self._cursorX = 0
+        self._cursorY = 0
     
     
     def setHome(self):
@@ -143,7 +194,7 @@ class I2CLCD:
         turn on LCD
         """
         self.backlight = 0x80
-        self._command(0x04)
+        self._command(0x06)
 
 
     def setCursor(self, x, y):
@@ -156,9 +207,23 @@ class I2CLCD:
         
         if y > 0: pos = 0xC0
         else: pos = 0x80
-        utime.sleep_ms(1)
         pos += x
-        self._command(pos)
+        self._queue(pos, False)
+        self._flush()
+        self._cursorX = x
+        self._cursorY = 1 if y > 0 else 0
+
+
+    def _putChar(self, code):
+        """
+        queue one character at the cursor and keep the shadow up to date
+        """
+        self._queue(code, True)
+        if self._cursorX < 0:
+            return
+        if self._cursorX < self.columns:
+            self._shadow[self._cursorY * self.columns + self._cursorX] = code
+        self._cursorX += 1
 
 
     def print(self, text):
@@ -166,4 +231,45 @@ class I2CLCD:
         print on LCD LCD
         """
         for char in text:
-            self._sendData(ord(char))
+            self._putChar(ord(char))
+        self._flush()
+
+
+    def writeAt(self, x, y, text):
+        """
+        write text at position (x,y), only characters that differ from the display are sent
+        x - column
+        y - row
+        text - text, cut off at the end of the line
+        """
+        if x < 0 or y < 0: return
+        if y >= self.rows: y = self.rows - 1
+        row = y * self.columns
+        for i in range(len(text)):
+            col = x + i
+            if col >= self.columns:
+                break
+            code = ord(text[i])
+            if self._shadow[row + col] == code:
+                continue
+            if self._cursorY != y or not 0 <= col - self._cursorX <= 1:
+                self._queue((0xC0 if y > 0 else 0x80) + col, False)
+                self._cursorX = col
+                self._cursorY = y
+            elif self._cursorX < col:
+                # writing one unchanged character again costs the same as moving the cursor
+                self._putChar(self._shadow[row + self._cursorX])
+            self._putChar(code)
+        self._flush()
+
+
+    def updateLines(self, *lines):
+        """
+        show whole lines, only characters that differ from the display are sent
+        lines - text of the first, second, ... line, filled up with spaces
+        """
+        for y in range(min(len(lines), self.rows)):
+            text = lines[y]
+            if len(text) < self.columns:
+                text += " " * (self.columns - len(text))
+            self.writeAt(0, y, text)
@@ -1,4 +1,87 @@
 import utime
+import micropython
+from array import array
+from machine import Timer
+from font import FONT5X5
+
+# ++++++++++++++++++++++++++ colour tables ++++++++++++++++++++++++++
+# 8-bit gamma correction (gamma 2.6), same values as the controller's gamma8()
+GAMMA8 = bytes((
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 3, 3, 3, 3,
+    3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 5, 6, 6, 6, 6, 7,
+    7, 7, 8, 8, 8, 9, 9, 9, 10, 10, 10, 11, 11, 11, 12, 12,
+    13, 13, 13, 14, 14, 15, 15, 16, 16, 17, 17, 18, 18, 19, 19, 20,
+    20, 21, 21, 22, 22, 23, 24, 24, 25, 25, 26, 27, 27, 28, 29, 29,
+    30, 31, 31, 32, 33, 34, 34, 35, 36, 37, 38, 38, 39, 40, 41, 42,
+    42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57,
+    58, 59, 60, 61, 62, 63, 64, 65, 66, 68, 69, 70, 71, 72, 73, 75,
+    76, 77, 78, 80, 81, 82, 84, 85, 86, 88, 89, 90, 92, 93, 94, 96,
+    97, 99, 100, 102, 103, 105, 106, 108, 109, 111, 112, 114, 115, 117, 119, 120,
+    122, 124, 125, 127, 129, 130, 132, 134, 136, 137, 139, 141, 143, 145, 146, 148,
+    150, 152, 154, 156, 158, 160, 162, 164, 166, 168, 170, 172, 174, 176, 178, 180,
+    182, 184, 186, 188, 191, 193, 195, 197, 199, 202, 204, 206, 209, 211, 213, 215,
+    218, 220, 223, 225, 227, 230, 232, 235, 237, 240, 242, 245, 247, 250, 252, 255,
+))
+
+# colour wheel, 3 bytes RGB for each of the 256 positions
+WHEEL = bytearray(768)
+for _pos in range(256):
+    if _pos < 85:
+        WHEEL[_pos * 3:_pos * 3 + 3] = bytes((_pos * 3, 255 - _pos * 3, 0))
+    elif _pos < 170:
+        WHEEL[_pos * 3:_pos * 3 + 3] = bytes((255 - (_pos - 85) * 3, 0, (_pos - 85) * 3))
+    else:
+        WHEEL[_pos * 3:_pos * 3 + 3] = bytes((0, (_pos - 170) * 3, 255 - (_pos - 170) * 3))
+del _pos
+
+def wheel(pos):
+    """
+    Return the colour wheel colour at position 0-255 as 24-bit integer (0xRRGGBB)
+
+    :param pos: position on the colour wheel
+    """
+    i = (pos & 255) * 3
+    return (WHEEL[i] << 16) | (WHEEL[i + 1] << 8) | WHEEL[i + 2]
+
+def colorHSV(hue, sat=255, val=255):
+    """
+    Convert a HSV colour to a 24-bit integer (0xRRGGBB) with integer math only,
+    same result as the controller's ColorHSV()
+
+    :param hue: hue 0-65535 (wraps around)
+    :param sat: saturation 0-255
+    :param val: value (brightness) 0-255
+    """
+    hue = ((hue & 0xFFFF) * 1530 + 32768) // 65536
+    if hue < 510:
+        b = 0
+        if hue < 255:
+            r, g = 255, hue
+        else:
+            r, g = 510 - hue, 255
+    elif hue < 1020:
+        r = 0
+        if hue < 765:
+            g, b = 255, hue - 510
+        else:
+            g, b = 1020 - hue, 255
+    elif hue < 1530:
+        g = 0
+        if hue < 1275:
+            r, b = hue - 1020, 255
+        else:
+            r, b = 255, 1530 - hue
+    else:
+        r, g, b = 255, 0, 0
+    v1 = 1 + val
+    s1 = 1 + sat
+    s2 = 255 - sat
+    r = ((((r * s1) >> 8) + s2) * v1) >> 8
+    g = ((((g * s1) >> 8) + s2) * v1) >> 8
+    b = ((((b * s1) >> 8) + s2) * v1) >> 8
+    return (r << 16) | (g << 8) | b
 
 # ++++++++++++++++++++++++++ RGB_Matrix object ++++++++++++++++++++++++++
 class RGB_Matrix:
@@ -27,6 +110,175 @@ class RGB_Matrix:
         # Create the I2C-based PixelStrip instance
         self.strip = PixelStrip(num=self.LED_COUNT, i2c=i2c, brightness=self.LED_BRIGHTNESS, i2c_adress=i2c_adress)
         self.strip.begin()
+        self.setLayout(8, count // 8)
+
+    def setLayout(self, width=8, height=8, rotation=0, mirror=False, serpentine=False):
+        """
+        Set how the pixels are wired and build the (x, y) to index map,
+        x = 0, y = 0 is the top left corner after rotation and mirroring
+
+        :param width: pixels per row of the panel
+        :param height: number of rows of the panel
+        :param rotation: rotation of the picture clockwise in degrees (0, 90, 180, 270)
+        :param mirror: mirror the picture horizontally
+        :param serpentine: every second row of the panel is wired right to left
+        """
+        if rotation in (90, 270):
+            self.width, self.height = height, width
+        else:
+            self.width, self.height = width, height
+        self._xyMap = array("H", bytes(2 * width * height))
+        for y in range(self.height):
+            for x in range(self.width):
+                lx = self.width - 1 - x if mirror else x
+                if rotation == 90:
+                    px, py = width - 1 - y, lx
+                elif rotation == 180:
+                    px, py = width - 1 - lx, height - 1 - y
+                elif rotation == 270:
+                    px, py = y, height - 1 - lx
+                else:
+                    px, py = lx, y
+                if serpentine and py & 1:
+                    px = width - 1 - px
+                self._xyMap[y * self.width + x] = py * width + px
+
+    def getIndex(self, x, y):
+        """
+        Return the pixel index of a position
+
+        :param x: column (0 is left)
+        :param y: row (0 is top)
+        """
+        return self._xyMap[y * self.width + x]
+
+    def setPixelXY(self, x, y, colour):
+        """
+        set pixel at a position to colour, positions outside the matrix are ignored
+
+        :param x: column (0 is left)
+        :param y: row (0 is top)
+        :param colour: RGBW value 32 bit integer or tuple
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.strip.setPixelColor(self._xyMap[y * self.width + x], colour)
+
+    def blit(self, sprite, x=0, y=0, colour=(255, 255, 255), width=8, bg=None):
+        """
+        Draw a 1 bit bitmap into the pixel buffer, shown with the next show()
+
+        :param sprite: bitmap, (width + 7) // 8 bytes per row, most significant bit is the left pixel
+        :param x: column of the left edge, may be negative
+        :param y: row of the top edge, may be negative
+        :param colour: colour of set bits (RGBW, integer or tuple)
+        :param width: width of the bitmap in pixels
+        :param bg: colour of cleared bits, None leaves those pixels unchanged
+        """
+        r, g, b = _rgb(colour)
+        if bg is not None:
+            br, bgr, bb = _rgb(bg)
+        stride = (width + 7) // 8
+        shadow = self.strip._shadow
+        xyMap = self._xyMap
+        for row in range(max(0, -y), min(len(sprite) // stride, self.height - y)):
+            line = row * stride
+            mapRow = (y + row) * self.width + x
+            for col in range(max(0, -x), min(width, self.width - x)):
+                i = xyMap[mapRow + col] * 3
+                if sprite[line + (col >> 3)] & (0x80 >> (col & 7)):
+                    shadow[i] = r
+                    shadow[i + 1] = g
+                    shadow[i + 2] = b
+                elif bg is not None:
+                    shadow[i] = br
+                    shadow[i + 1] = bgr
+                    shadow[i + 2] = bb
+
+    def textEffect(self, frame, text, colour=(255, 255, 255), bg=(0, 0, 0), y=None, font=FONT5X5, loop=False):
+        """
+        Scroll text from right to left, one column per frame.
+        Generator for the Animator, can also render straight into strip._shadow
+
+        :param frame: frame buffer to draw into (3 bytes RGB per pixel)
+        :param text: text to scroll
+        :param colour: text colour (RGBW, integer or tuple)
+        :param bg: background colour of the text rows (RGBW, integer or tuple)
+        :param y: row of the top of the text - default centered
+        :param font: font.Font, only the top 8 rows of the glyphs are used
+        :param loop: start again when the text has left the matrix
+        """
+        r, g, b = _rgb(colour)
+        br, bgr, bb = _rgb(bg)
+        if y is None:
+            y = (self.height - font.height) // 2
+        # column buffer: one byte per column, bit 0 is the top row, blank matrix width on both sides
+        columns = bytearray(self.width)
+        for char in text:
+            width, data = font.glyph(char)
+            columns.extend(data[0:width])
+            columns.append(0)
+        columns.extend(bytes(self.width))
+        top = max(0, -y)
+        bottom = min(font.height, 8, self.height - y)
+        xyMap = self._xyMap
+        last = len(columns) - self.width
+        while True:
+            offset = 0
+            while offset <= last:
+                for x in range(self.width):
+                    bits = columns[offset + x]
+                    for row in range(top, bottom):
+                        i = xyMap[(y + row) * self.width + x] * 3
+                        if bits & (1 << row):
+                            frame[i] = r
+                            frame[i + 1] = g
+                            frame[i + 2] = b
+                        else:
+                            frame[i] = br
+                            frame[i + 1] = bgr
+                            frame[i + 2] = bb
+                skip = (yield) or 1
+                if not loop and offset < last < offset + skip:
+                    # a skip past the end still shows the last position
+                    skip = last - offset
+                offset += skip
+            if not loop:
+                return
+
+    def scrollText(self, text, colour=(255, 255, 255), bg=(0, 0, 0), wait_ms=80, y=None, font=FONT5X5):
+        """
+        Scroll text once over the matrix
+
+        :param text: text to scroll
+        :param colour: text colour (RGBW, integer or tuple)
+        :param bg: background colour of the text rows (RGBW, integer or tuple)
+        :param wait_ms: time between each step of one column
+        :param y: row of the top of the text - default centered
+        :param font: font.Font
+        """
+        for _ in self.textEffect(self.strip._shadow, text, colour, bg, y, font):
+            self.strip.show()
+            utime.sleep_ms(wait_ms)
+
+    def playAnimation(self, path, iterations=1):
+        """
+        Play an animation file (see tools/encode_animation.py), streamed from flash
+
+        :param path: path of the animation file
+        :param iterations: iterations of animation
+        """
+        animation = AnimationFile(path)
+        try:
+            due = utime.ticks_ms()
+            for j in range(iterations):
+                for duration in animation.frames(self.strip._shadow):
+                    self.strip.show()
+                    due = utime.ticks_add(due, duration)
+                    wait = utime.ticks_diff(due, utime.ticks_ms())
+                    if wait > 0:
+                        utime.sleep_ms(wait)
+        finally:
+            animation.close()
 
     def clean(self):
         """
@@ -67,14 +319,7 @@ class RGB_Matrix:
 
         :param pos: selected pixel
         """
-        if pos < 85:
-            return RGBW(pos * 3, 255 - pos * 3, 0, 0).unpackHEX()
-        elif pos < 170:
-            pos -= 85
-            return RGBW(255 - pos * 3, 0, pos * 3, 0).unpackHEX()
-        else:
-            pos -= 170
-            return RGBW(0, pos * 3, 255 - pos * 3, 0).unpackHEX()
+        return wheel(pos)
 
     def rainbow(self, wait_ms=20, iterations=1):
         """
@@ -178,6 +423,20 @@ class RGBW:
     Format (32-bit):
         [ W (8 bit) | R (8 bit) | G (8 bit) | B (8 bit) ]
     """
+    # only saves memory on CPython, MicroPython ignores __slots__
+    __slots__ = ("_value",)
+
+    @staticmethod
+    def pack(r, g, b, w=0):
+        """
+        Pack colour components into a 32-bit integer without creating an RGBW object
+
+        :param r: Red value (0–255)
+        :param g: Green value (0–255)
+        :param b: Blue value (0–255)
+        :param w: White value (0–255), optional (default = 0)
+        """
+        return ((w & 0xff) << 24) | ((r & 0xff) << 16) | ((g & 0xff) << 8) | (b & 0xff)
 
     def __init__(self, r, g=None, b=None, w=None):
         """
@@ -198,7 +457,11 @@ class RGBW:
             self._value = (w << 24) | (r << 16) | (g << 8) | b
 
     def unpackRGBW(self):
-        return self.getRed(), self.getGreen(), self.getBlue(), self.getWhite()
+        value = self._value
+        return (value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff, (value >> 24) & 0xff
+
+    def __int__(self):
+        return self._value
     
     def unpackHEX(self):
         return self._value
@@ -264,18 +527,62 @@ class PixelStrip:
     Controls a strip of LEDs (WS281x / SK6812) via I2C.
     """
 
-    def __init__(self, num, i2c, brightness=255, i2c_adress = 0x66):
+    # time in microseconds the controller needs to process a command before it accepts the next one,
+    # the strip only waits for the part of it that has not already passed
+    PROCESSING_TIME = {
+        FunctionEnum.SHOW: 2500,
+        FunctionEnum.SETPIXELCOLOR: 300,
+        FunctionEnum.FILL: 500,
+        FunctionEnum.SETBRIGHTNESS: 500,
+        FunctionEnum.GAMMA8: 500,
+        FunctionEnum.GAMMA32: 500,
+        FunctionEnum.NUMPIXEL: 300,
+        FunctionEnum.COLORHSV: 500,
+        FunctionEnum.CLEAR: 500,
+        FunctionEnum.SENDDATA2SHOW: 3000,
+        FunctionEnum.SENDALLPIXRGB0: 300,
+        FunctionEnum.SENDALLPIXRGB1: 300,
+        FunctionEnum.SENDALLPIXRGB2: 300,
+        FunctionEnum.SENDALLPIXRGB3: 300,
+        FunctionEnum.SENDALLPIXRGB4: 300,
+        FunctionEnum.SENDALLPIXRGB5: 300,
+    }
+    DEFAULT_PROCESSING_TIME = 3000
+
+    # cost model used by show() to pick the cheapest encoding of a frame,
+    # estimated in microseconds: processing time per command plus 90 us per byte at 100 kHz
+    BYTE_COST = 90
+    PACKET_SIZE = 15    # address + 14 byte command packet
+    CHUNK_SIZE = 35     # address + command + length + 32 data bytes
+
+    def __init__(self, num, i2c, brightness=255, i2c_adress = 0x66, processing_time = None):
         """
         initilize LED controll class
         
         :param num: amount of pixel to controll
         :param brightness: brightness of all pixels
+        :param processing_time: dictionary of function ID to processing time in microseconds, overrides PROCESSING_TIME
         """
         self.num = num
         self.address = i2c_adress
         self.i2c = i2c
         self.transfer_data = LEDTransferData()
         self.transfer_data.setBright(brightness)
+        # local copy of all pixels (3 bytes RGB per pixel), uploaded as a whole by show()
+        self._shadow = bytearray(num * 3)
+        # what the controller received last, show() only sends the difference
+        self._sent = bytearray(num * 3)
+        self._synced = False
+        # gamma table applied to the frame on upload, None for no correction
+        self._gamma = None
+        self._corrected = None
+        self.processing_time = dict(self.PROCESSING_TIME)
+        if processing_time:
+            self.processing_time.update(processing_time)
+        self._readyAt = utime.ticks_us()
+        # reused for every SENDALLPIXRGB chunk: command, length, 32 data bytes
+        self._chunk = bytearray(34)
+        self._chunkView = memoryview(self._chunk)
 
     def begin(self):
         """
@@ -290,39 +597,62 @@ class PixelStrip:
 
         :param cmd: block of data to send
         """
-        data = bytes([
-            cmd & 0xFF,
-            0x0C,
-            self.transfer_data.func & 0xFF,
-            self.transfer_data.pos & 0xFF,
-            self.transfer_data.r & 0xFF,
-            self.transfer_data.g & 0xFF,
-            self.transfer_data.b & 0xFF,
-            self.transfer_data.w & 0xFF,
-            self.transfer_data.c & 0xFF,
-            self.transfer_data.bright & 0xFF,
-            self.transfer_data.first & 0xFF,
-            self.transfer_data.count & 0xFF,
-            self.transfer_data.data & 0xFF,
-            self.transfer_data.data1 & 0xFF,
-        ])
-        self.i2c.writeto(self.address, data)
-        utime.sleep_ms(3)  # Hardware timing delay
+        packet = self.transfer_data.packet
+        packet[LEDTransferData.CMD] = cmd & 0xFF
+        self.waitReady()
+        self.i2c.writeto(self.address, packet)
+        self._busy(packet[LEDTransferData.FUNC])
         self.transfer_data.clean()
 
     def _write(self, cmd, data):
         """
-        Send a command byte followed by a data block
+        Send a command byte followed by a data block of up to 32 bytes
+
+        :param cmd: command byte
+        :param data: data bytes (bytes, bytearray or memoryview)
+        """
+        size = len(data)
+        self._chunk[0] = cmd & 0xFF
+        self._chunk[1] = size
+        self._chunk[2:2 + size] = data
+        self.waitReady()
+        if size == 32:
+            self.i2c.writeto(self.address, self._chunk)
+        else:
+            self.i2c.writeto(self.address, self._chunkView[:2 + size])
+        self._busy(cmd)
+
+    def _busy(self, func):
+        """
+        Remember when the controller will be done with the command that was just sent
+
+        :param func: Function ID of the command
         """
-        buffer = bytes([cmd & 0xFF, len(data) & 0xFF] + [value & 0xFF for value in data])
-        self.i2c.writeto(buffer)
-        utime.sleep_ms(3)
+        self._readyAt = utime.ticks_add(utime.ticks_us(), self.processing_time.get(func, self.DEFAULT_PROCESSING_TIME))
+
+    def waitReady(self):
+        """
+        Wait until the controller has processed the last command, returns at once if that time has already passed
+        """
+        wait = utime.ticks_diff(self._readyAt, utime.ticks_us())
+        if wait > 0:
+            utime.sleep_us(wait)
+
+    def setProcessingTime(self, func, time_us):
+        """
+        Set the time the controller needs for a command
+
+        :param func: Function ID (see FunctionEnum)
+        :param time_us: processing time in microseconds
+        """
+        self.processing_time[func] = time_us
 
     def _read(self):
         """
         Read one byte from the I2C device
         """
-        return int.from_bytes(self.i2c.readfrom_mem(self.address, reg, 1), 'little')
+        self.waitReady()
+        return self.i2c.readfrom(self.address, 1)[0]
     
     def __len__(self):
         """
@@ -334,26 +664,209 @@ class PixelStrip:
         """
         Clear the entire LED strip (turn off all pixels)
         """
+        for i in range(len(self._shadow)):
+            self._shadow[i] = 0
+            self._sent[i] = 0
+        self._synced = True
         self.transfer_data.setFunc(FunctionEnum.CLEAR)
         self.send(0x00)
 
     def show(self):
         """
-        Show updated pixel data on the LED strip
+        Send the pixels changed since the last show() with the cheapest encoding and show them on the LED strip
         """
+        full = self._cost(FunctionEnum.SHOW, self.PACKET_SIZE)
+        for i in range(6):
+            full += self._cost(FunctionEnum.SENDALLPIXRGB0 + i, self.CHUNK_SIZE)
+        frame = self._frame()
+        if self._synced:
+            runs, masks = self._encode(frame)
+            cost = len(masks) * self._cost(FunctionEnum.SENDDATA2SHOW, self.PACKET_SIZE)
+            for first, end, colour in runs:
+                cost += self._cost(FunctionEnum.SETPIXELCOLOR if end - first == 1 else FunctionEnum.FILL, self.PACKET_SIZE)
+            if not masks:
+                # otherwise the last SENDDATA2SHOW packet already shows the frame
+                cost += self._cost(FunctionEnum.SHOW, self.PACKET_SIZE)
+            if cost < full:
+                for first, end, colour in runs:
+                    r, g, b = (colour >> 16) & 0xFF, (colour >> 8) & 0xFF, colour & 0xFF
+                    if end - first == 1:
+                        self._sendPixel(first, r, g, b)
+                    else:
+                        self._sendFill(first, end, r, g, b)
+                for colour in masks:
+                    self._sendMask(masks[colour], (colour >> 16) & 0xFF, (colour >> 8) & 0xFF, colour & 0xFF)
+                if not masks:
+                    self.transfer_data.setFunc(FunctionEnum.SHOW)
+                    self.send(0x00)
+                return
+        self.sendAllPixRGB(frame)
+        self._sent[:] = frame
+        self._synced = True
         self.transfer_data.setFunc(FunctionEnum.SHOW)
         self.send(0x00)
 
+    def _cost(self, func, size):
+        """
+        Estimated time in microseconds for one command
+
+        :param func: Function ID of the command
+        :param size: number of bytes on the bus
+        """
+        return self.processing_time.get(func, self.DEFAULT_PROCESSING_TIME) + size * self.BYTE_COST
+
+    def _frame(self):
+        """
+        Return the pixels as they are sent to the controller, with gamma correction if enabled
+        """
+        if self._gamma is None:
+            return self._shadow
+        table = self._gamma
+        shadow = self._shadow
+        frame = self._corrected
+        for i in range(len(shadow)):
+            frame[i] = table[shadow[i]]
+        return frame
+
+    def setGamma(self, enabled=True, table=GAMMA8):
+        """
+        Enable gamma correction of all pixels, applied to the whole frame before it is sent
+
+        :param enabled: True to enable, False to disable
+        :param table: 256 byte lookup table - default GAMMA8
+        """
+        if enabled:
+            self._gamma = table
+            self._corrected = bytearray(len(self._shadow))
+        else:
+            self._gamma = None
+            self._corrected = None
+
+    def _encode(self, shadow):
+        """
+        Split the difference between frame and sent pixels into FILL/SETPIXELCOLOR runs
+        and SENDDATA2SHOW bitmask groups, returns (runs, masks)
+
+        :param shadow: pixels to send (3 bytes RGB per pixel)
+        """
+        sent = self._sent
+        groups = {}
+        i = 0
+        while i < self.num:
+            j = i * 3
+            if shadow[j] == sent[j] and shadow[j + 1] == sent[j + 1] and shadow[j + 2] == sent[j + 2]:
+                i += 1
+                continue
+            colour = (shadow[j] << 16) | (shadow[j + 1] << 8) | shadow[j + 2]
+            # a run covers all following pixels of the same colour, changed or not
+            end = i + 1
+            while end < self.num and shadow[end * 3] == shadow[j] and shadow[end * 3 + 1] == shadow[j + 1] and shadow[end * 3 + 2] == shadow[j + 2]:
+                end += 1
+            if colour in groups:
+                groups[colour].append((i, end))
+            else:
+                groups[colour] = [(i, end)]
+            i = end
+        runs = []
+        masks = {}
+        for colour in groups:
+            group = groups[colour]
+            # one bitmask packet replaces several runs of the same colour, but only reaches the first 64 pixels
+            if len(group) > 1 and group[-1][1] <= 64:
+                masks[colour] = [n for first, end in group for n in range(first, end)]
+            else:
+                for first, end in group:
+                    runs.append((first, end, colour))
+        return runs, masks
+
+    def _sendPixel(self, n, red, green, blue):
+        """
+        Send a single pixel colour with SETPIXELCOLOR
+
+        :param n: Pixel position index
+        :param red: colour value of red
+        :param green: colour value of green
+        :param blue: colour value of blue
+        """
+        i = n * 3
+        self._sent[i] = red
+        self._sent[i + 1] = green
+        self._sent[i + 2] = blue
+        self.transfer_data.setPos(n)
+        self.transfer_data.setR(red)
+        self.transfer_data.setG(green)
+        self.transfer_data.setB(blue)
+        self.transfer_data.setFunc(FunctionEnum.SETPIXELCOLOR)
+        self.send(0x00)
+
+    def _sendFill(self, first, end, red, green, blue, white=0):
+        """
+        Send one colour for a range of pixels with FILL
+
+        :param first: index of the first pixel
+        :param end: index after the last pixel
+        :param red: colour value of red
+        :param green: colour value of green
+        :param blue: colour value of blue
+        :param white: colour value of white - default 0
+        """
+        for i in range(max(first, 0), min(end, self.num)):
+            self._sent[i * 3] = red
+            self._sent[i * 3 + 1] = green
+            self._sent[i * 3 + 2] = blue
+        self.transfer_data.setR(red)
+        self.transfer_data.setG(green)
+        self.transfer_data.setB(blue)
+        self.transfer_data.setW(white)
+        self.transfer_data.setFirst(first)
+        self.transfer_data.setCount(end - first)
+        self.transfer_data.setFunc(FunctionEnum.FILL)
+        self.send(0x00)
+
+    def _sendMask(self, pos, red, green, blue):
+        """
+        Send one colour for a set of pixels with a SENDDATA2SHOW bitmask, the controller shows it immediately
+
+        :param pos: Pixel position indices (0-63)
+        :param red: colour value of red
+        :param green: colour value of green
+        :param blue: colour value of blue
+        """
+        self.transfer_data.setR(red)
+        self.transfer_data.setG(green)
+        self.transfer_data.setB(blue)
+        packet = self.transfer_data.packet
+        for i in pos:
+            if 0 <= i < self.num:
+                self._sent[i * 3] = red
+                self._sent[i * 3 + 1] = green
+                self._sent[i * 3 + 2] = blue
+            if 0 <= i <= 63:
+                # pixels 0-63 are spread over the pos, w, c, bright, first, count, data and data1 bytes
+                packet[_MASK_FIELDS[i >> 3]] |= 1 << (i & 7)
+        self.transfer_data.setFunc(FunctionEnum.SENDDATA2SHOW)
+        self.send(0x00)
+
+    def _correct(self, value):
+        """
+        Apply the gamma table to one colour value if gamma correction is enabled
+        """
+        value &= 0xFF
+        if self._gamma is None:
+            return value
+        return self._gamma[value]
+
     def getWRGB(self, color):
         """
         Extract W, R, G, B values from a single color int
 
         :param color: single color int
         """
-        if isinstance(color, RGBW):
-            color = color.unpackHEX()
-        elif not isinstance(color, int):
-            return 0 & 0xffffffff
+        if type(color) is not int:
+            if isinstance(color, RGBW):
+                color = color._value
+            elif not isinstance(color, int):
+                return 0 & 0xffffffff
         return (
             (color >> 24) & 0xff, 
             (color >> 16) & 0xff, 
@@ -368,7 +881,14 @@ class PixelStrip:
         :param n: Pixel position index
         :param color: 32-bit color or tupel of (r,g,b) or (r,g,b,w)
         """
-        self.transfer_data.setPos(n)
+        if type(color) is int:
+            # fast path without unpacking into a tuple
+            if 0 <= n < self.num:
+                i = n * 3
+                self._shadow[i] = (color >> 16) & 0xFF
+                self._shadow[i + 1] = (color >> 8) & 0xFF
+                self._shadow[i + 2] = color & 0xFF
+            return
         if isinstance(color, tuple):
             if len(color) == 3:
                 r, g, b = color
@@ -381,22 +901,69 @@ class PixelStrip:
 
     def setPixelColorRGB(self, n, red, green, blue, white=0):
         """
-        set Pixel colour at specific index
+        set Pixel colour at specific index, the pixel is sent with the next show()
 
         :param n: Pixel position index
         :param red: colour value of red
         :param green: colour value of green
         :param blue: colour value of blue
-        :param white: colour value of white - default 0
+        :param white: colour value of white - default 0 (not part of the bulk transfer, ignored)
+        """
+        if 0 <= n < self.num:
+            i = n * 3
+            self._shadow[i] = red & 0xFF
+            self._shadow[i + 1] = green & 0xFF
+            self._shadow[i + 2] = blue & 0xFF
+
+    def setPixels(self, buf, start=0, bpp=3):
+        """
+        Copy a whole block of pixels into the pixel buffer, sent with the next show()
+
+        :param buf: bytes, bytearray or memoryview with 3 bytes RGB (bpp=3) or 4 bytes RGBW (bpp=4) per pixel
+        :param start: index of the first pixel to set
+        :param bpp: bytes per pixel, 3 or 4 (white is ignored)
+        """
+        count = min(len(buf) // bpp, self.num - start)
+        if start < 0 or count <= 0:
+            return
+        if bpp == 3:
+            self._shadow[start * 3:(start + count) * 3] = buf[0:count * 3]
+            return
+        shadow = self._shadow
+        i = start * 3
+        for k in range(0, count * bpp, bpp):
+            shadow[i] = buf[k]
+            shadow[i + 1] = buf[k + 1]
+            shadow[i + 2] = buf[k + 2]
+            i += 3
+
+    def setRange(self, first, colours):
+        """
+        Set consecutive pixels from a sequence of integer colours, sent with the next show()
+
+        :param first: index of the first pixel to set
+        :param colours: list, tuple or array of 24/32-bit colours (0xWWRRGGBB, white is ignored)
+        """
+        shadow = self._shadow
+        n = first
+        for colour in colours:
+            if n >= self.num:
+                break
+            if n >= 0:
+                i = n * 3
+                shadow[i] = (colour >> 16) & 0xFF
+                shadow[i + 1] = (colour >> 8) & 0xFF
+                shadow[i + 2] = colour & 0xFF
+            n += 1
+
+    def getPixelColor(self, n):
+        """
+        Return the colour of the pixel at index n as 24-bit integer (0xRRGGBB)
+
+        :param n: Pixel position index
         """
-        self.transfer_data.setPos(n)
-        self.transfer_data.setR(red)
-        self.transfer_data.setG(green)
-        self.transfer_data.setB(blue)
-        self.transfer_data.setW(white)
-        self.transfer_data.setC(0)
-        self.transfer_data.setFunc(FunctionEnum.SETPIXELCOLOR)
-        self.send(0x00)
+        i = n * 3
+        return (self._shadow[i] << 16) | (self._shadow[i + 1] << 8) | self._shadow[i + 2]
 
     def sendPos2Show(self, pos, r=0, g=0, b=0):
         """
@@ -407,28 +974,12 @@ class PixelStrip:
         :param g: colour value of green
         :param b: colour value of blue
         """
-        self.transfer_data.setR(r)
-        self.transfer_data.setG(g)
-        self.transfer_data.setB(b)
         for i in pos:
-            if 0 <= i <= 7:
-                self.transfer_data.pos |= 1 << i
-            elif 8 <= i <= 15:
-                self.transfer_data.w |= 1 << (i - 8)
-            elif 16 <= i <= 23:
-                self.transfer_data.c |= 1 << (i - 16)
-            elif 24 <= i <= 31:
-                self.transfer_data.bright |= 1 << (i - 24)
-            elif 32 <= i <= 39:
-                self.transfer_data.first |= 1 << (i - 32)
-            elif 40 <= i <= 47:
-                self.transfer_data.count |= 1 << (i - 40)
-            elif 48 <= i <= 55:
-                self.transfer_data.data |= 1 << (i - 48)
-            elif 56 <= i <= 63:
-                self.transfer_data.data1 |= 1 << (i - 56)
-        self.transfer_data.setFunc(FunctionEnum.SENDDATA2SHOW)
-        self.send(0x00)
+            if 0 <= i < self.num:
+                self._shadow[i * 3] = r & 0xFF
+                self._shadow[i * 3 + 1] = g & 0xFF
+                self._shadow[i * 3 + 2] = b & 0xFF
+        self._sendMask(pos, self._correct(r), self._correct(g), self._correct(b))
 
     def sendColor2Show(self, pos, color=0):
         """
@@ -454,13 +1005,13 @@ class PixelStrip:
         """
         Send large RGB data (6 chunks of 32 bytes each) to fill multiple pixels
 
-        :param self: Description
-        :param rgb: RGB value to write onto pixels
+        :param rgb: RGB bytes of all pixels (3 bytes per pixel)
         """
+        view = memoryview(rgb)
         for i in range(6):
             start = 32 * i
             end = start + 32
-            self._write( FunctionEnum.SENDALLPIXRGB0 + i, rgb[start:end])
+            self._write( FunctionEnum.SENDALLPIXRGB0 + i, view[start:end])
 
     def fill(self, r=0, g=0, b=0, w=0, first=0, end=64):
         """
@@ -473,14 +1024,11 @@ class PixelStrip:
         :param first: index of pixel to begin writing color on
         :param end: index of pixel to end writing colour on
         """
-        self.transfer_data.setR(r)
-        self.transfer_data.setG(g)
-        self.transfer_data.setB(b)
-        self.transfer_data.setW(w)
-        self.transfer_data.setFirst(first)
-        self.transfer_data.setCount(end - first)
-        self.transfer_data.setFunc(FunctionEnum.FILL)
-        self.send(0x00)
+        for i in range(max(first, 0), min(end, self.num)):
+            self._shadow[i * 3] = r & 0xFF
+            self._shadow[i * 3 + 1] = g & 0xFF
+            self._shadow[i * 3 + 2] = b & 0xFF
+        self._sendFill(first, end, self._correct(r), self._correct(g), self._correct(b), w)
 
     def fillColor(self, color, first=0, end=63):
         """
@@ -518,38 +1066,41 @@ class PixelStrip:
 
     def getGamma8(self, x):
         """
-        Applies 8-bit gamma correction to the given input value.
+        Applies 8-bit gamma correction to the given input value (local table, no I2C transfer).
 
         :param x: 8-bit input value (0-255)
         """
-        self.transfer_data.setFunc(FunctionEnum.GAMMA8)
-        self.transfer_data.setData(x)
-        self.send(0x01)
-        return self._read()
+        return GAMMA8[x & 0xFF]
 
     def getGamma32(self, x):
         """
-        Applies 32-bit gamma correction to the given input value.
+        Applies 8-bit gamma correction to each channel of a packed 32-bit colour (local table, no I2C transfer).
 
         :param x: 32-bit input value
         """
-        self.transfer_data.setFunc(FunctionEnum.GAMMA32)
-        self.transfer_data.setData(x)
-        self.send(0x01)
-        return self._read()
+        return (GAMMA8[(x >> 24) & 0xFF] << 24) | (GAMMA8[(x >> 16) & 0xFF] << 16) | (GAMMA8[(x >> 8) & 0xFF] << 8) | GAMMA8[x & 0xFF]
 
-    def getColorHSV(self, x):
+    def getColorHSV(self, hue, sat=255, val=255):
         """
-        Converts an HSV color value into the device-specific RGB format.
+        Converts an HSV color value into a 24-bit RGB integer (local integer math, no I2C transfer).
 
-        :param x: HSV input value (device-dependent encoding)
+        :param hue: hue 0-65535
+        :param sat: saturation 0-255
+        :param val: value (brightness) 0-255
         """
-        self.transfer_data.setFunc(FunctionEnum.COLORHSV)
-        self.transfer_data.setData(x)
-        self.send(0x01)
-        return self._read()
+        return colorHSV(hue, sat, val)
 
 # ++++++++++++++++++++++++++ LEDTransferData object ++++++++++++++++++++++++++
+def _field(offset):
+    """
+    Property reading and writing one byte of the command packet
+    """
+    def get(self):
+        return self.packet[offset]
+    def set(self, value):
+        self.packet[offset] = value & 0xFF
+    return property(get, set)
+
 class LEDTransferData:
     """
     Data container class used to prepare and store parameters for I2C
@@ -557,8 +1108,39 @@ class LEDTransferData:
 
     This class encapsulates all fields required to build a command packet,
     including function identifiers, pixel position, color values, brightness,
-    and range parameters for bulk operations.
+    and range parameters for bulk operations. The fields are stored directly
+    in the 14 byte packet that is sent, so no data is allocated per command.
     """
+    # offsets of the fields in the command packet
+    CMD    = 0
+    LENGTH = 1
+    FUNC   = 2
+    POS    = 3
+    R      = 4
+    G      = 5
+    B      = 6
+    W      = 7
+    C      = 8
+    BRIGHT = 9
+    FIRST  = 10
+    COUNT  = 11
+    DATA   = 12
+    DATA1  = 13
+    SIZE   = 14
+
+    func   = _field(FUNC)
+    pos    = _field(POS)
+    r      = _field(R)
+    g      = _field(G)
+    b      = _field(B)
+    w      = _field(W)
+    c      = _field(C)
+    bright = _field(BRIGHT)
+    first  = _field(FIRST)
+    count  = _field(COUNT)
+    data   = _field(DATA)
+    data1  = _field(DATA1)
+
     def __init__(self, func=0, pos=0, r=0, g=0, b=0, w=0, c=0, bright=5, first=0, count=0):
         """
         Initialize the data structure for an LED control command
@@ -574,18 +1156,18 @@ class LEDTransferData:
         :param first: First pixel index for range operations
         :param count: Number of pixels affected in range operations
         """
-        self.func   = func
-        self.pos    = pos
-        self.r      = r
-        self.g      = g
-        self.b      = b
-        self.w      = w
-        self.c      = c
-        self.bright = bright
-        self.first  = first
-        self.count  = count
-        self.data   = 0
-        self.data1  = 0
+        self.packet = bytearray(self.SIZE)
+        self.packet[self.LENGTH] = 0x0C
+        self.setFunc(func)
+        self.setPos(pos)
+        self.setR(r)
+        self.setG(g)
+        self.setB(b)
+        self.setW(w)
+        self.setC(c)
+        self.setBright(bright)
+        self.setFirst(first)
+        self.setCount(count)
 
     def setFunc(self, func=0):
         """
@@ -593,80 +1175,80 @@ class LEDTransferData:
 
         :param func: Function ID - default = 0 - SHOW
         """
-        self.func = func
-    
+        self.packet[self.FUNC] = func & 0xFF
+
     def setPos(self, pos=0):
         """
         set Pixel position index
         
         :param pos: Pixel position index - default = 0
         """
-        self.pos = pos
-    
+        self.packet[self.POS] = pos & 0xFF
+
     def setR(self, r=0):
         """
         set Red color component
 
         :param r: Red color component - default = 0
         """
-        self.r = r
-    
+        self.packet[self.R] = r & 0xFF
+
     def setG(self, g=0):
         """
         set Green color component 
 
         :param g: Green color component - default = 0
         """
-        self.g = g
-    
+        self.packet[self.G] = g & 0xFF
+
     def setB(self, b=0):
         """
         set Blue color component
         
         :param b: Blue color component - default = 0
         """
-        self.b = b
-    
+        self.packet[self.B] = b & 0xFF
+
     def setW(self, w=0):
         """
         set White color component
         
         :param w: White color component - default = 0
         """
-        self.w = w
-    
+        self.packet[self.W] = w & 0xFF
+
     def setC(self, c=0):
         """
         set Additional color or control parameter
         
         :param c: Additional color or control parameter - default = 0
         """
-        self.c = c
-    
+        self.packet[self.C] = c & 0xFF
+
     def setFirst(self, first=0):
         """
         set First pixel index for range operations
         
         :param first: First pixel index for range operations - default = 0
         """
-        self.first = first
-    
+        self.packet[self.FIRST] = first & 0xFF
+
     def setCount(self, count=0):
         """
         set Number of pixels affected in range operations
         
         :param count: Number of pixels affected in range operations - default = 0
         """
-        self.count = count
-    
+        self.packet[self.COUNT] = count & 0xFF
+
     def setBright(self, bright=0):
         """
         set Global brightness level
 
         :param bright: Global brightness level - default = 0
         """
-        self.bright = bright
-    
+        self.packet[self.BRIGHT] = bright & 0xFF
+
     def setData(self, data=0):
         """
         Sets the primary data value for the I²C command packet.
@@ -677,8 +1259,8 @@ class LEDTransferData:
         
         :param data: Integer value to be assigned to the primary data field - default = 0
         """
-        self.data = data
-    
+        self.packet[self.DATA] = data & 0xFF
+
     def setData1(self, data=0):
         """
         Sets the secondary data value for the I²C command packet.
@@ -688,21 +1270,398 @@ class LEDTransferData:
         
         :param data: Integer value to be assigned to the secondary data field - default = 0
         """
-        self.data1 = data
+        self.packet[self.DATA1] = data & 0xFF
 
     def clean(self):
         """
         Reset all internal fields to zero after transmission
         """
-        self.func   = 0
-        self.pos    = 0
-        self.r      = 0
-        self.g      = 0
-        self.b      = 0
-        self.w      = 0
-        self.c      = 0
-        self.bright = 0
-        self.first  = 0
-        self.count  = 0
-        self.data   = 0
-        self.data1  = 0
+        packet = self.packet
+        for i in range(self.FUNC, self.SIZE):
+            packet[i] = 0
+
+# packet fields holding the SENDDATA2SHOW bitmask for pixels 0-7, 8-15, ... 56-63
+_MASK_FIELDS = bytes((LEDTransferData.POS, LEDTransferData.W, LEDTransferData.C, LEDTransferData.BRIGHT,
+                      LEDTransferData.FIRST, LEDTransferData.COUNT, LEDTransferData.DATA, LEDTransferData.DATA1))
+
+# ++++++++++++++++++++++++++ AnimationFile object ++++++++++++++++++++++++++
+class AnimationFile:
+    """
+    Reads an animation file created with tools/encode_animation.py.
+
+    Frames are read in small chunks straight into a frame buffer, full RGB
+    frames without any copy, so the memory use does not depend on the
+    length of the animation.
+    """
+    FULL_RGB        = 0
+    FULL_INDEXED    = 1
+    DELTA_RGB       = 2
+    DELTA_INDEXED   = 3
+    CHUNK_SIZE      = 48    # multiple of all entry sizes (1, 2, 3 and 4 bytes)
+
+    def __init__(self, path):
+        """
+        open an animation file and read its header and palette
+
+        :param path: path of the animation file
+        """
+        self._file = open(path, "rb")
+        header = self._file.read(8)
+        if len(header) < 8 or header[0:2] != b"RA":
+            self._file.close()
+            raise ValueError("not an animation file")
+        self.num = header[2] | (header[3] << 8)
+        self.frameCount = header[6] | (header[7] << 8)
+        self.palette = self._file.read(3 * (header[4] | (header[5] << 8)))
+        self._start = self._file.tell()
+        self._head = bytearray(5)
+        self._chunk = bytearray(self.CHUNK_SIZE)
+        self._chunkView = memoryview(self._chunk)
+
+    def close(self):
+        """
+        close the file
+        """
+        self._file.close()
+
+    def frames(self, frame):
+        """
+        Generator decoding one frame after the other into frame, yields the duration of each frame in ms
+
+        :param frame: frame buffer (3 bytes RGB per pixel), e.g. strip._shadow
+        """
+        view = memoryview(frame)
+        palette = self.palette
+        chunk = self._chunk
+        num = min(self.num, len(frame) // 3)
+        self._file.seek(self._start)
+        for n in range(self.frameCount):
+            if self._file.readinto(self._head) < 5:
+                return
+            kind = self._head[0]
+            duration = self._head[1] | (self._head[2] << 8)
+            size = self._head[3] | (self._head[4] << 8)
+            if kind == AnimationFile.FULL_RGB and size == num * 3:
+                self._file.readinto(view[0:size])
+                yield duration
+                continue
+            pos = 0
+            while size > 0:
+                length = self._file.readinto(self._chunkView[0:min(size, self.CHUNK_SIZE)])
+                if not length:
+                    return
+                size -= length
+                if kind == AnimationFile.FULL_RGB:
+                    end = min(pos + length, num * 3)
+                    view[pos:end] = self._chunkView[0:end - pos]
+                    pos += length
+                elif kind == AnimationFile.FULL_INDEXED:
+                    for k in range(length):
+                        if pos < num:
+                            c = chunk[k] * 3
+                            frame[pos * 3] = palette[c]
+                            frame[pos * 3 + 1] = palette[c + 1]
+                            frame[pos * 3 + 2] = palette[c + 2]
+                        pos += 1
+                elif kind == AnimationFile.DELTA_RGB:
+                    for k in range(0, length, 4):
+                        i = chunk[k]
+                        if i < num:
+                            frame[i * 3] = chunk[k + 1]
+                            frame[i * 3 + 1] = chunk[k + 2]
+                            frame[i * 3 + 2] = chunk[k + 3]
+                elif kind == AnimationFile.DELTA_INDEXED:
+                    for k in range(0, length, 2):
+                        i = chunk[k]
+                        if i < num:
+                            c = chunk[k + 1] * 3
+                            frame[i * 3] = palette[c]
+                            frame[i * 3 + 1] = palette[c + 1]
+                            frame[i * 3 + 2] = palette[c + 2]
+            yield duration
+
+# ++++++++++++++++++++++++++ Animator object ++++++++++++++++++++++++++
+class Animator:
+    """
+    Non-blocking animation engine for a PixelStrip.
+
+    Effects are generator functions that render one frame into a bytearray
+    (3 bytes RGB per pixel) each time they are resumed. Several effects can
+    run at once as layers which are blended in the order they were added.
+    The animator is driven by calling tick() from the main loop, by start()
+    with a timer or by the run() asyncio task. When it falls behind, frames
+    are skipped so the effects keep their speed: the yield expression of an
+    effect returns the number of frames to advance (None counts as 1) and
+    only the resulting frame is rendered.
+    """
+    REPLACE = 0     # layer replaces everything below
+    ADD     = 1     # colour values are added (saturating)
+    MAX     = 2     # the brighter value of each channel wins
+    OVER    = 3     # pixels that are not black replace those below
+
+    def __init__(self, strip, fps=30):
+        """
+        initialize animation engine
+
+        :param strip: PixelStrip to draw on
+        :param fps: target frame rate
+        """
+        self.strip = strip
+        self.layers = []
+        self.dropped = 0
+        self._timer = None
+        # bound once, creating it in the timer callback would allocate inside the IRQ
+        self._scheduledRef = self._scheduled
+        self.setFPS(fps)
+
+    def setFPS(self, fps):
+        """
+        set target frame rate
+
+        :param fps: frames per second
+        """
+        self.period = 1000000 // fps
+        self._next = utime.ticks_us()
+
+    def add(self, effect, mode=OVER, **kwargs):
+        """
+        Add an effect as new top layer and return the layer
+
+        :param effect: generator function, called as effect(frame, **kwargs)
+        :param mode: blend mode of the layer - default OVER
+        :param kwargs: parameters of the effect
+        """
+        layer = Layer(effect, self.strip.num, mode, **kwargs)
+        self.layers.append(layer)
+        return layer
+
+    def remove(self, layer):
+        """
+        Remove a layer
+
+        :param layer: layer returned by add()
+        """
+        if layer in self.layers:
+            self.layers.remove(layer)
+
+    def clear(self):
+        """
+        Remove all layers
+        """
+        self.layers = []
+
+    def tick(self):
+        """
+        Render and show a frame if one is due, returns True if a frame was shown
+        """
+        late = utime.ticks_diff(utime.ticks_us(), self._next)
+        if late < 0:
+            return False
+        frames = late // self.period + 1
+        self.dropped += frames - 1
+        self._next = utime.ticks_add(self._next, frames * self.period)
+        for layer in self.layers[:]:
+            if not layer.advance(frames):
+                self.layers.remove(layer)
+        if not self.layers:
+            # keep the last frame when all effects have finished
+            return False
+        self.compose()
+        self.strip.show()
+        return True
+
+    def compose(self):
+        """
+        Blend all layers into the pixels of the strip
+        """
+        out = self.strip._shadow
+        if not self.layers or self.layers[0].mode != Animator.REPLACE:
+            for i in range(len(out)):
+                out[i] = 0
+        for layer in self.layers:
+            frame = layer.frame
+            mode = layer.mode
+            if mode == Animator.REPLACE:
+                out[:] = frame
+            elif mode == Animator.ADD:
+                for i in range(len(out)):
+                    v = out[i] + frame[i]
+                    out[i] = v if v < 255 else 255
+            elif mode == Animator.MAX:
+                for i in range(len(out)):
+                    if frame[i] > out[i]:
+                        out[i] = frame[i]
+            else:
+                for i in range(0, len(out), 3):
+                    if frame[i] or frame[i + 1] or frame[i + 2]:
+                        out[i] = frame[i]
+                        out[i + 1] = frame[i + 1]
+                        out[i + 2] = frame[i + 2]
+
+    def start(self, timer_id=-1):
+        """
+        Drive the animation from a periodic timer, the frames are rendered via micropython.schedule
+
+        :param timer_id: id of the timer - default -1 (software timer)
+        """
+        self.stop()
+        self._next = utime.ticks_us()
+        self._timer = Timer(timer_id)
+        self._timer.init(period=max(1, self.period // 1000), mode=Timer.PERIODIC, callback=self._timerCallback)
+
+    def stop(self):
+        """
+        Stop the timer started with start()
+        """
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+
+    def _timerCallback(self, timer):
+        try:
+            micropython.schedule(self._scheduledRef, None)
+        except RuntimeError:
+            # schedule queue full, the next tick catches up
+            pass
+
+    def _scheduled(self, arg):
+        self.tick()
+
+    async def run(self):
+        """
+        asyncio task driving the animation until all layers have finished
+        """
+        import asyncio
+        self._next = utime.ticks_us()
+        while self.layers:
+            self.tick()
+            wait = utime.ticks_diff(self._next, utime.ticks_us())
+            await asyncio.sleep_ms(max(0, wait // 1000))
+
+# ++++++++++++++++++++++++++ Layer object ++++++++++++++++++++++++++
+class Layer:
+    """
+    One running effect of an Animator with its own frame buffer.
+    """
+
+    def __init__(self, effect, num, mode, **kwargs):
+        """
+        initialize layer
+
+        :param effect: generator function, called as effect(frame, **kwargs)
+        :param num: amount of pixels
+        :param mode: blend mode (see Animator)
+        """
+        self.frame = bytearray(num * 3)
+        self.mode = mode
+        self._generator = effect(self.frame, **kwargs)
+        self._started = False
+
+    def advance(self, frames=1):
+        """
+        Render the frame frames steps ahead, the frames in between are not rendered,
+        returns False when the effect has finished
+
+        :param frames: number of frames to advance, sent into the effect generator
+        """
+        try:
+            if self._started:
+                self._generator.send(frames)
+            else:
+                # the first frame is rendered before the first yield
+                next(self._generator)
+                self._started = True
+        except StopIteration:
+            return False
+        return True
+
+# ++++++++++++++++++++++++++ effects ++++++++++++++++++++++++++
+def _rgb(colour):
+    """
+    Return (r, g, b) of a tuple, RGBW or 32 bit integer colour
+    """
+    if isinstance(colour, tuple):
+        return colour[0], colour[1], colour[2]
+    if isinstance(colour, RGBW):
+        colour = colour.unpackHEX()
+    return (colour >> 16) & 0xff, (colour >> 8) & 0xff, colour & 0xff
+
+def rainbowEffect(frame, step=1, iterations=None):
+    """
+    Rainbow over all pixels
+
+    :param frame: frame buffer of the layer
+    :param step: colour wheel positions per frame
+    :param iterations: number of full colour cycles, None runs forever
+    """
+    num = len(frame) // 3
+    # last wheel position reached without skipped frames
+    last = None if iterations is None else (256 * iterations - 1) // step * step
+    j = 0
+    while last is None or j <= last:
+        for i in range(num):
+            pos = ((i + j) & 255) * 3
+            frame[i * 3] = WHEEL[pos]
+            frame[i * 3 + 1] = WHEEL[pos + 1]
+            frame[i * 3 + 2] = WHEEL[pos + 2]
+        skip = step * ((yield) or 1)
+        if last is not None and j < last < j + skip:
+            # a skip past the end still shows the last frame
+            skip = last - j
+        j += skip
+
+def wipeEffect(frame, colour, loop=False):
+    """
+    Fill the pixels one by one with a colour
+
+    :param frame: frame buffer of the layer
+    :param colour: RGB value (RGBW, integer or tuple)
+    :param loop: start again from an empty frame when done
+    """
+    r, g, b = _rgb(colour)
+    num = len(frame) // 3
+    t = 0
+    lit = 0
+    while loop or t < num:
+        end = t % num + 1
+        if end <= lit:
+            # a new round started
+            for i in range(len(frame)):
+                frame[i] = 0
+            lit = 0
+        # skipped frames only light more pixels at once
+        for i in range(lit, end):
+            frame[i * 3] = r
+            frame[i * 3 + 1] = g
+            frame[i * 3 + 2] = b
+        lit = end
+        skip = (yield) or 1
+        if not loop and t < num - 1 < t + skip:
+            # a skip past the end still lights the last pixels
+            skip = num - 1 - t
+        t += skip
+
+def chaseEffect(frame, colour, spacing=3, iterations=None):
+    """
+    Theater chase, every spacing-th pixel is lit and the pattern moves on each frame
+
+    :param frame: frame buffer of the layer
+    :param colour: RGB value (RGBW, integer or tuple)
+    :param spacing: distance between lit pixels
+    :param iterations: number of frames, None runs forever
+    """
+    r, g, b = _rgb(colour)
+    j = 0
+    while iterations is None or j < iterations:
+        for i in range(len(frame) // 3):
+            if (i + j) % spacing:
+                frame[i * 3] = frame[i * 3 + 1] = frame[i * 3 + 2] = 0
+            else:
+                frame[i * 3] = r
+                frame[i * 3 + 1] = g
+                frame[i * 3 + 2] = b
+        skip = (yield) or 1
+        if iterations is not None and j < iterations - 1 < j + skip:
+            # a skip past the end still shows the last frame
+            skip = iterations - 1 - j
+        j += skip
@@ -25,7 +25,9 @@ SOFTWARE.
 """
 
 from micropython import const
+import micropython
 import framebuf
+import time
 
 
 # register definitions
@@ -46,6 +48,17 @@ SET_DISP_CLK_DIV = const(0xD5)
 SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
+SET_HSCROLL = const(0x26)  # 0x27 scrolls left
+SET_HVSCROLL = const(0x29)  # 0x2A scrolls left
+SET_VSCROLL_AREA = const(0xA3)
+SET_SCROLL_OFF = const(0x2E)
+SET_SCROLL_ON = const(0x2F)
+
+# unchanged bytes between two changed runs that are sent along instead of starting a new window
+RUN_GAP = const(8)
+
+# scroll step interval in frames -> register value
+SCROLL_INTERVALS = {2: 7, 3: 4, 4: 5, 5: 0, 25: 6, 64: 1, 128: 2, 256: 3}
 
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
@@ -56,11 +69,25 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self.buffer_view = memoryview(self.buffer)
+        # copy of the display RAM, show() only sends the bytes that differ from it
+        self.sent = bytearray(len(self.buffer))
+        self.sent_view = memoryview(self.sent)
+        self.synced = False
+        self.back = None
+        self.frame_ready = False
+        self.timer = None
+        self.show_ready_ref = self.show_ready
+        self.window_cmds = bytearray((SET_COL_ADDR, 0, 0, SET_PAGE_ADDR, 0, 0))
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
     def init_display(self):
-        for cmd in (
+        self.synced = False
+        self.scrolling = False
+        self.start_line = 0
+        self.contrast_level = 0xFF
+        self.write_cmds((
             SET_DISP | 0x00,  # off
             # address setting
             SET_MEM_ADDR,
@@ -90,9 +117,8 @@ class SSD1306(framebuf.FrameBuffer):
             # charge pump
             SET_CHARGE_PUMP,
             0x10 if self.external_vcc else 0x14,
-            SET_DISP | 0x01,
-        ):  # on
-            self.write_cmd(cmd)
+            SET_DISP | 0x01,  # on
+        ))
         self.fill(0)
         self.show()
 
@@ -103,26 +129,159 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_DISP | 0x01)
 
     def contrast(self, contrast):
-        self.write_cmd(SET_CONTRAST)
-        self.write_cmd(contrast)
+        self.write_cmds((SET_CONTRAST, contrast))
+        self.contrast_level = contrast
+
+    def fade(self, contrast, duration_ms=500, steps=16):
+        # ramp the contrast from the current level, e.g. fade(0) to fade out
+        start = self.contrast_level
+        for i in range(1, steps + 1):
+            self.contrast(start + (contrast - start) * i // steps)
+            time.sleep_ms(duration_ms // steps)
+
+    def start_scroll(self, left=False, start_page=0, end_page=None, frames=5, vertical=0):
+        # hardware scroll of the pages start_page..end_page, one column every `frames` frames,
+        # vertical > 0 also scrolls all rows up by that many rows per step (diagonal scroll)
+        if end_page is None:
+            end_page = self.pages - 1
+        interval = SCROLL_INTERVALS[min(SCROLL_INTERVALS, key=lambda f: abs(f - frames))]
+        if vertical:
+            cmds = (
+                SET_SCROLL_OFF,
+                SET_VSCROLL_AREA, 0, self.height,
+                SET_HVSCROLL + (1 if left else 0), 0x00, start_page, interval, end_page, vertical % self.height,
+                SET_SCROLL_ON,
+            )
+        else:
+            cmds = (
+                SET_SCROLL_OFF,
+                SET_HSCROLL + (1 if left else 0), 0x00, start_page, interval, end_page, 0x00, 0xFF,
+                SET_SCROLL_ON,
+            )
+        self.write_cmds(cmds)
+        self.scrolling = True
+
+    def stop_scroll(self):
+        # the controller leaves the scrolled content in RAM, the next show() sends the whole buffer
+        self.write_cmd(SET_SCROLL_OFF)
+        self.scrolling = False
+        self.synced = False
+
+    def set_start_line(self, line):
+        # display RAM row shown at the top, moves the picture without touching the RAM
+        self.start_line = line % 64
+        self.write_cmd(SET_DISP_START_LINE | self.start_line)
+
+    def roll(self, lines, delay_ms=10):
+        # move the picture up (lines > 0) or down row by row with the start line
+        step = 1 if lines > 0 else -1
+        for i in range(abs(lines)):
+            self.set_start_line(self.start_line + step)
+            time.sleep_ms(delay_ms)
 
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
 
+    def font_text(self, string, x, y, font, c=1, bg=None):
+        # draw string with a font.Font object, returns the width in pixels
+        return font.draw(self, string, x, y, c, bg)
+
     def show(self):
-        x0 = 0
-        x1 = self.width - 1
+        self.frame_ready = False
+        if self.scrolling:
+            self.stop_scroll()
+        if not self.synced:
+            self.sent[:] = self.buffer
+            self.write_window(0, self.width - 1, 0, self.pages - 1, self.sent)
+            self.synced = True
+            return
+        # send only the changed runs of each page, the data is taken from the copy
+        # so it always matches what was sent even if the buffer changes meanwhile
+        buf = self.buffer
+        sent = self.sent
+        for page in range(self.pages):
+            first = page * self.width
+            last = first + self.width
+            if buf[first:last] == sent[first:last]:
+                continue
+            x = first
+            while x < last:
+                if buf[x] == sent[x]:
+                    x += 1
+                    continue
+                start = x
+                end = x + 1
+                gap = 0
+                x += 1
+                while x < last and gap < RUN_GAP:
+                    if buf[x] == sent[x]:
+                        gap += 1
+                    else:
+                        gap = 0
+                        end = x + 1
+                    x += 1
+                sent[start:end] = buf[start:end]
+                self.write_window(start - first, end - 1 - first, page, page, self.sent_view[start:end])
+
+    def init_back_buffer(self):
+        # second frame buffer to draw the next frame into while the display shows the last one
+        self.back_buffer = bytearray(self.buffer)
+        self.back = framebuf.FrameBuffer(self.back_buffer, self.width, self.height, framebuf.MONO_VLSB)
+        return self.back
+
+    def present(self):
+        # hand the finished back buffer over for sending, drawing can go on right away
+        self.buffer[:] = self.back_buffer
+        self.frame_ready = True
+
+    def swap(self):
+        self.present()
+        self.show()
+
+    def show_ready(self, arg=None):
+        if self.frame_ready:
+            self.show()
+
+    def start_swapping(self, fps=30, timer_id=-1):
+        # send presented frames from a timer, the transfer runs via micropython.schedule
+        from machine import Timer
+
+        self.stop_swapping()
+        self.timer = Timer(timer_id)
+        self.timer.init(period=1000 // fps, mode=Timer.PERIODIC, callback=self.timer_callback)
+
+    def timer_callback(self, timer):
+        try:
+            micropython.schedule(self.show_ready_ref, None)
+        except RuntimeError:
+            # schedule queue full, the frame is sent on the next tick
+            pass
+
+    def stop_swapping(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    async def swap_task(self, fps=30):
+        # asyncio task sending presented frames
+        import asyncio
+
+        while True:
+            self.show_ready()
+            await asyncio.sleep_ms(1000 // fps)
+
+    def write_window(self, x0, x1, page0, page1, buf):
         if self.width == 64:
             # displays with width of 64 pixels are shifted by 32
             x0 += 32
             x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        cmds = self.window_cmds
+        cmds[1] = x0
+        cmds[2] = x1
+        cmds[4] = page0
+        cmds[5] = page1
+        self.write_cmds(cmds)
+        self.write_data(buf)
 
 
 class SSD1306_I2C(SSD1306):
@@ -131,6 +290,7 @@ class SSD1306_I2C(SSD1306):
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        self.cmd_list = [b"\x00", None]  # Co=0, D/C#=0
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
@@ -138,6 +298,13 @@ class SSD1306_I2C(SSD1306):
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
 
+    def write_cmds(self, cmds):
+        # all commands in one transaction as command stream
+        if not isinstance(cmds, (bytes, bytearray)):
+            cmds = bytes(cmds)
+        self.cmd_list[1] = cmds
+        self.i2c.writevto(self.addr, self.cmd_list)
+
     def write_data(self, buf):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
@@ -146,6 +313,9 @@ class SSD1306_I2C(SSD1306):
 class SSD1306_SPI(SSD1306):
     def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
         self.rate = 10 * 1024 * 1024
+        # bus configuration last set by this driver, set to None if another device changed it
+        self.spi_config = None
+        self.temp = bytearray(1)
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
         cs.init(cs.OUT, value=1)
@@ -162,16 +332,29 @@ class SSD1306_SPI(SSD1306):
         self.res(1)
         super().__init__(width, height, external_vcc)
 
+    def init_spi(self):
+        config = (self.rate, 0, 0)
+        if config != self.spi_config:
+            self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+            self.spi_config = config
+
     def write_cmd(self, cmd):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.temp[0] = cmd
+        self.write_cmds(self.temp)
+
+    def write_cmds(self, cmds):
+        # all commands in one CS window
+        if not isinstance(cmds, (bytes, bytearray)):
+            cmds = bytes(cmds)
+        self.init_spi()
         self.cs(1)
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([cmd]))
+        self.spi.write(cmds)
         self.cs(1)
 
     def write_data(self, buf):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.init_spi()
         self.cs(1)
         self.dc(1)
         self.cs(0)
@@ -1,6 +1,14 @@
 import utime
+import struct
 import machine
+import framebuf
 from machine import Pin
+from collections import OrderedDict
+from font import FONT5X5
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
 
 class ST7735:
     
@@ -24,6 +32,8 @@ class ST7735:
     RAMRD = 0x2E
     
     PTLAR = 0x30
+    VSCRDEF = 0x33
+    VSCRSADD = 0x37
     COLMOD = 0x3A
     MADCTL = 0x36
     
@@ -50,29 +60,45 @@ class ST7735:
     GMCTRP1 = 0xE0
     GMCTRN1 = 0xE1
     
-    fontOne = [0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422,
-       0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422,
-       0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422]
-    fontTwo = [0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422,
-       0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x0022D422, 0x00000000, 0x000002E0,
-       0x00018060, 0x00AFABEA, 0x00AED6EA, 0x01991133, 0x010556AA, 0x00000060]
-    fontThree = [0x000045C0, 0x00003A20, 0x00051140, 0x00023880, 0x00002200, 0x00021080,
-       0x00000100, 0x00111110, 0x0007462E, 0x00087E40, 0x000956B9, 0x0005D629, 0x008FA54C, 0x009AD6B7,
-       0x008ADA88, 0x00119531, 0x00AAD6AA, 0x0022B6A2, 0x00000140, 0x00002A00]
-    fontFour = [0x0008A880, 0x00052940, 0x00022A20, 0x0022D422, 0x00E4D62E, 0x000F14BE,
-       0x000556BF, 0x0008C62E, 0x0007463F, 0x0008D6BF, 0x000094BF, 0x00CAC62E, 0x000F909F, 0x000047F1,
-       0x0017C629, 0x0008A89F, 0x0008421F, 0x01F1105F, 0x01F4105F, 0x0007462E]
-    fontFive = [0x000114BF, 0x000B6526, 0x010514BF, 0x0004D6B2, 0x0010FC21, 0x0007C20F,
-       0x00744107, 0x01F4111F, 0x000D909B, 0x00117041, 0x0008CEB9, 0x0008C7E0, 0x01041041, 0x000FC620,
-       0x00010440, 0x01084210, 0x00000820, 0x010F4A4C, 0x0004529F, 0x00094A4C]
-    fontSix = [0x000FD288, 0x000956AE, 0x000097C4, 0x0007D6A2, 0x000C109F, 0x000003A0,
-       0x0006C200, 0x0008289F, 0x000841E0, 0x01E1105E, 0x000E085E, 0x00064A4C, 0x0002295E, 0x000F2944,
-       0x0001085C, 0x00012A90, 0x010A51E0, 0x010F420E, 0x00644106, 0x01E8221E]
-    fontSeven = [0x00093192, 0x00222292, 0x00095B52, 0x0008FC80, 0x000003E0, 0x000013F1,
-       0x00841080, 0x0022D422]
-    
-    
-    def __init__(self, spi, dc = 26, res = 27, cs = 10, x_offset = 2, y_offset = 1, rgbMode = "bgr"):
+    # init sequence: command, number of parameters (bit 7 set if a delay in ms follows), parameters, delay
+    INIT_SEQUENCE = bytes((
+        SWRESET, 1, 0x01,                                       # Software reset
+        SLPOUT, 1, 0x01,                                        # Exit sleep mode
+        FRMCTR1, 3, 0x01, 0x2C, 0x2D,                           # Frame rate control - normal mode
+        FRMCTR2, 6, 0x01, 0x2C, 0x2D, 0x01, 0x2C, 0x2D,         # Frame rate control - idle mode
+        INVCTR, 1, 0x07,                                        # Display inversion control
+        PWCTR1, 3, 0xA2, 0x02, 0x84,                            # Display power control
+        PWCTR2, 2, 0x8A, 0x2A,
+        PWCTR3, 2, 0x0A, 0x00,
+        PWCTR4, 2, 0x8A, 0x2A,
+        PWCTR5, 2, 0x8A, 0xEE,
+        VMCTR1, 1, 0x0E,
+        INVOFF, 0,                                              # Disable inversion
+        MADCTL, 1, 0xC8,                                        # Memory access control
+        COLMOD, 1, 0x05,                                        # Set 16-bit color mode
+        CASET, 4, 0x00, 0x00, 0x00, 0x7F,                       # Column address set
+        RASET, 4, 0x00, 0x00, 0x00, 0x9F,                       # Row address set
+        GMCTRP1, 16, 0x02, 0x1C, 0x07, 0x12, 0x37, 0x32, 0x29, 0x2D,    # Set Gamma
+                     0x29, 0x25, 0x2B, 0x39, 0x00, 0x01, 0x03, 0x10,
+        GMCTRN1, 16, 0x03, 0x1D, 0x07, 0x06, 0x2E, 0x2C, 0x29, 0x2D,
+                     0x2E, 0x2E, 0x37, 0x3F, 0x00, 0x00, 0x02, 0x10,
+        NORON, 0,                                               # Set normal mode
+    ))
+    
+    _RAMWR_COMMAND = bytes((RAMWR,))
+    
+    # kinds of recorded drawing operations
+    FILL = 0
+    BLIT = 1
+    
+    # rows of the display memory used for hardware scrolling
+    MEMORY_ROWS = 162
+    
+    # size of the reusable fill buffer in bytes (must be even) and number of cached colours
+    FILL_BUFFER_SIZE = 1024
+    PALETTE_SIZE = 32
+    
+    def __init__(self, spi, dc = 26, res = 27, cs = 10, x_offset = 2, y_offset = 1, rgbMode = "bgr", glyphCacheSize = 4096):
         """
         initialize TFT display
         spi - established SPI communication
@@ -82,6 +108,7 @@ class ST7735:
         x_offset - offset of x axis
         y_offset - offset of y axis
         rgbMode - set RGB Mode
+        glyphCacheSize - memory budget in bytes for rendered characters of print
         """
         self.spi = spi
         self._dc = machine.Pin(dc, machine.Pin.OUT)
@@ -92,6 +119,38 @@ class ST7735:
         self.height = 160 + y_offset
         self.offset = [x_offset, y_offset]
         self.colourMode = rgbMode
+        
+        # framebuffer state, None while drawing directly to the panel
+        self._fb = None
+        self._fbView = None
+        self.canvas = None
+        self._bandY = 0
+        self._bandHeight = 0
+        self._dirty = []
+        self._maxDirty = 8
+        
+        self.glyphCache = GlyphCache(glyphCacheSize)
+        self.font = FONT5X5
+        
+        # preallocated buffers for commands and the last window sent to the display
+        self._commandBuf = bytearray(1)
+        self._windowBuf = bytearray(4)
+        self._winX0 = self._winX1 = self._winY0 = self._winY1 = -1
+        
+        # reusable buffer for fills and palette of converted colours
+        self._fillBuf = bytearray(self.FILL_BUFFER_SIZE)
+        self._fillView = memoryview(self._fillBuf)
+        self._fillColour = 0
+        self._palette = {}
+        
+        # display list of recorded drawing operations, None while drawing immediately
+        self._displayList = None
+        self._session = 0
+        
+        # hardware scrolling area
+        self._scrollTop = y_offset
+        self._scrollHeight = 160
+        self._scrollOffset = 0
 
         
     def reset(self):
@@ -107,22 +166,49 @@ class ST7735:
     def send(self, command, data):
         """
         method to send commands and data
+        command - command byte
+        data - parameters as bytes, bytearray, memoryview or list
         """
+        if command == self.CASET:
+            self._winX0 = -1
+        elif command == self.RASET:
+            self._winY0 = -1
+        self._commandBuf[0] = command
         self._dc.low()
-        self._cs.low()
-        self.spi.write(bytearray([command]))
-        self._dc.high()
-        for item in data:
-            self.spi.write(bytearray([item]))
-        self._cs.high()
+        if not self._session:
+            self._cs.low()
+        self.spi.write(self._commandBuf)
+        if len(data):
+            if isinstance(data, list):
+                data = bytes(data)
+            self._dc.high()
+            self.spi.write(data)
+        if not self._session:
+            self._cs.high()
         
         
     def setWindow(self, x0, y0, x1, y1):
         """
-        sets Window to draw in
+        sets Window to draw in, unchanged column or row ranges are not sent again
         """
-        self.send(self.CASET, [0x00, x0, 0x00, x1])
-        self.send(self.RASET, [0x00, y0, 0x00, y1])
+        if x0 != self._winX0 or x1 != self._winX1:
+            buf = self._windowBuf
+            buf[0] = x0 >> 8
+            buf[1] = x0 & 0xFF
+            buf[2] = x1 >> 8
+            buf[3] = x1 & 0xFF
+            self.send(self.CASET, buf)
+            self._winX0 = x0
+            self._winX1 = x1
+        if y0 != self._winY0 or y1 != self._winY1:
+            buf = self._windowBuf
+            buf[0] = y0 >> 8
+            buf[1] = y0 & 0xFF
+            buf[2] = y1 >> 8
+            buf[3] = y1 & 0xFF
+            self.send(self.RASET, buf)
+            self._winY0 = y0
+            self._winY1 = y1
         
         
     def begin(self):
@@ -130,38 +216,19 @@ class ST7735:
         setup routine of TFT display
         """
         self.reset()
-        #Software reset
-        self.send(self.SWRESET, [1])
-        #Exit Sleep mode
-        self.send(self.SLPOUT, [1])
-        #Frame rate control - normal mode
-        self.send(self.FRMCTR1, [0x01, 0x2C, 0x2D])
-        #Frame rate control - idle mode
-        self.send(self.FRMCTR2, [0x01, 0x2C, 0x2D, 0x01, 0x2C, 0x2D])
-        # Display inversion control
-        self.send(self.INVCTR, [0x07])
-        # Display power control
-        self.send(self.PWCTR1, [0xA2, 0x02, 0x84])
-        self.send(self.PWCTR2, [0x8A, 0x2A])
-        self.send(self.PWCTR3, [0x0A, 0x00])
-        self.send(self.PWCTR4, [0x8A, 0x2A])
-        self.send(self.PWCTR5, [0x8A, 0xEE])
-        self.send(self.VMCTR1, [0x0E])
-        # Disable inversion
-        self.send(self.INVOFF, [])
-        # Memory access control
-        self.send(self.MADCTL, [0xC8])
-        # Set 16-bit color mode
-        self.send(self.COLMOD, [0x05])
-        # Column address set
-        self.send(self.CASET, [0x00, 0x00, 0x00, 0x7F])
-        # Row address set
-        self.send(self.RASET, [0x00, 0x00, 0x00, 0x9F])
-        # Set Gamma
-        self.send(self.GMCTRP1, [0x02, 0x1C, 0x07, 0x12, 0x37, 0x32, 0x29, 0x2D, 0x29, 0x25, 0x2B, 0x39, 0x00, 0x01, 0x03, 0x10])
-        self.send(self.GMCTRN1, [0x03, 0x1D, 0x07, 0x06, 0x2E, 0x2C, 0x29, 0x2D, 0x2E, 0x2E, 0x37, 0x3F, 0x00, 0x00, 0x02, 0x10])
-        # Set normal mode
-        self.send(self.NORON, [])
+        self._winX0 = self._winX1 = self._winY0 = self._winY1 = -1
+        init = memoryview(self.INIT_SEQUENCE)
+        index = 0
+        while index < len(init):
+            command = init[index]
+            length = init[index + 1] & 0x7F
+            delay = init[index + 1] & 0x80
+            index += 2
+            self.send(command, init[index:index + length])
+            index += length
+            if delay:
+                utime.sleep_ms(init[index])
+                index += 1
         # Turn display on
         self.turnOn()
 
@@ -171,8 +238,9 @@ class ST7735:
         prepare display to get data
         """
         self._dc.low()
-        self._cs.low()
-        self.spi.write(bytearray([self.RAMWR]))
+        if not self._session:
+            self._cs.low()
+        self.spi.write(self._RAMWR_COMMAND)
         self._dc.high()
         
         
@@ -180,24 +248,456 @@ class ST7735:
         """
         end data transfer
         """
-        self._cs.high()
+        if not self._session:
+            self._cs.high()
         self._dc.low()
         
         
+    def _beginSession(self):
+        """
+        keep chip select low until _endSession, commands and data are sent without toggling it
+        """
+        if not self._session:
+            self._cs.low()
+        self._session += 1
+        
+        
+    def _endSession(self):
+        """
+        end session started with _beginSession
+        """
+        self._session -= 1
+        if not self._session:
+            self._cs.high()
+        
+        
     def convertColour(self, colour):
         """
-        convert tuple to hex
+        convert tuple to hex, converted tuples are kept in a palette,
+        integers are treated as packed RGB565 colours and returned unchanged
         """
+        if type(colour) is int:
+            return colour & 0xFFFF
+        try:
+            return self._palette[colour]
+        except (KeyError, TypeError):
+            pass
         try:
             if self.colourMode == "bgr":
                 b, g, r = colour
             else:
                 r, g, b = colour
-            return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            conv_col = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
         except:
             return 0x0000
+        if type(colour) is tuple:
+            if len(self._palette) >= self.PALETTE_SIZE:
+                self._palette = {}
+            self._palette[colour] = conv_col
+        return conv_col
             
         
+    def enableFramebuffer(self, bandHeight = None, maxDirty = 8):
+        """
+        draw into a RGB565 framebuffer in RAM instead of directly onto the display,
+        changes are sent to the display with flush()
+        bandHeight - rows held in RAM, None for the whole display
+                     (130 x 161 pixels need about 41 kB, use a smaller band to save RAM
+                     and draw the screen band by band with bands())
+        maxDirty - maximum number of dirty rectangles kept before they are merged or flushed
+        """
+        if bandHeight is None or bandHeight > self.height:
+            bandHeight = self.height
+        self._fb = None
+        self._fbView = None
+        self.canvas = None
+        self._fb = bytearray(self.width * bandHeight * 2)
+        self._fbView = memoryview(self._fb)
+        self._bandY = 0
+        self._bandHeight = bandHeight
+        self._dirty = []
+        self._maxDirty = maxDirty
+        
+        
+    def enableCanvas(self, bandHeight = None, background = (0, 0, 0)):
+        """
+        framebuffer mode with a framebuf.RGB565 canvas, the native methods of canvas
+        (fill_rect, line, text, blit, scroll, ...) draw with C speed in panel coordinates,
+        colours for canvas have to be converted with canvasColour()
+        bandHeight - rows held in RAM, None for the whole display; with bands the whole
+                     screen is drawn for every band
+        background - rgb tuple every band is cleared with in bands(), bands which did not
+                     change since the last frame are not sent
+        """
+        self.enableFramebuffer(bandHeight)
+        self.canvas = Canvas(self)
+        self._canvasBackground = self.canvasColour(background)
+        self._bandCRC = {}
+        
+        
+    def canvasColour(self, colour):
+        """
+        convert rgb tuple or RGB565 integer into the byte order used by canvas
+        """
+        colour = self.convertColour(colour)
+        return ((colour & 0xFF) << 8) | (colour >> 8)
+        
+        
+    def disableFramebuffer(self):
+        """
+        send pending changes, free the framebuffer and draw directly onto the display again
+        """
+        self.flush()
+        self._fb = None
+        self._fbView = None
+        self.canvas = None
+        self._dirty = []
+        
+        
+    def bands(self):
+        """
+        iterate over all bands of the framebuffer, draw the screen inside the loop,
+        every band is flushed before the next one is started
+        yields the first row and the height of the current band
+        """
+        y = 0
+        while y < self.height:
+            self.flush()
+            self._bandY = y
+            rows = min(self._bandHeight, self.height - y)
+            if self.canvas is not None:
+                framebuf.FrameBuffer.fill(self.canvas, self._canvasBackground)
+            yield y, rows
+            if self.canvas is not None:
+                # the band was cleared and drawn completely, send it if it differs from the last frame
+                self._dirty = []
+                if self._bandChanged(y, rows):
+                    self._markDirty(0, y, self.width - 1, y + rows - 1)
+            self.flush()
+            y += self._bandHeight
+        self._bandY = 0
+        
+        
+    def _bandChanged(self, y, rows):
+        """
+        compare checksum of the current band with the one of the last frame
+        """
+        if crc32 is None:
+            return True
+        crc = crc32(self._fbView[:rows * self.width * 2])
+        changed = self._bandCRC.get(y) != crc
+        self._bandCRC[y] = crc
+        return changed
+        
+        
+    def _isBanded(self):
+        """
+        returns True if the framebuffer does not cover the whole display
+        """
+        return self._bandHeight < self.height
+    
+    
+    def _markDirty(self, x0, y0, x1, y1):
+        """
+        add rectangle to the list of regions which have to be flushed,
+        overlapping or touching rectangles are merged
+        """
+        dirty = self._dirty
+        # a banded canvas is drawn completely, so all rows of the band are valid
+        banded = self._isBanded() and self.canvas is None
+        i = 0
+        while i < len(dirty):
+            r = dirty[i]
+            if x0 >= r[0] and y0 >= r[1] and x1 <= r[2] and y1 <= r[3]:
+                return
+            if banded:
+                # only rows drawn in this pass are valid, merge only if the union is fully covered
+                merge = (r[0] == x0 and r[2] == x1 and y0 <= r[3] + 1 and r[1] <= y1 + 1) or \
+                        (r[1] == y0 and r[3] == y1 and x0 <= r[2] + 1 and r[0] <= x1 + 1) or \
+                        (r[0] >= x0 and r[1] >= y0 and r[2] <= x1 and r[3] <= y1)
+            else:
+                merge = x0 <= r[2] + 1 and r[0] <= x1 + 1 and y0 <= r[3] + 1 and r[1] <= y1 + 1
+            if merge:
+                x0 = min(x0, r[0])
+                y0 = min(y0, r[1])
+                x1 = max(x1, r[2])
+                y1 = max(y1, r[3])
+                dirty.pop(i)
+                i = 0
+            else:
+                i += 1
+        if len(dirty) < self._maxDirty:
+            dirty.append([x0, y0, x1, y1])
+        elif banded:
+            # flush() starts a new list
+            self.flush()
+            self._dirty.append([x0, y0, x1, y1])
+        else:
+            # merge with the rectangle which grows the least
+            best = 0
+            bestArea = None
+            for i in range(len(dirty)):
+                r = dirty[i]
+                area = (max(x1, r[2]) - min(x0, r[0]) + 1) * (max(y1, r[3]) - min(y0, r[1]) + 1)
+                if bestArea is None or area < bestArea:
+                    best = i
+                    bestArea = area
+            r = dirty.pop(best)
+            self._markDirty(min(x0, r[0]), min(y0, r[1]), max(x1, r[2]), max(y1, r[3]))
+            
+            
+    def flush(self):
+        """
+        send all changed regions of the framebuffer to the display
+        """
+        if self._fb is None or not self._dirty:
+            return
+        rowBytes = self.width * 2
+        self._beginSession()
+        for x0, y0, x1, y1 in self._dirty:
+            self.setWindow(x0, y0, x1, y1)
+            self.enterDataMode()
+            start = (y0 - self._bandY) * rowBytes + x0 * 2
+            if x0 == 0 and x1 == self.width - 1:
+                self.spi.write(self._fbView[start:start + (y1 - y0 + 1) * rowBytes])
+            else:
+                length = (x1 - x0 + 1) * 2
+                for row in range(y1 - y0 + 1):
+                    self.spi.write(self._fbView[start:start + length])
+                    start += rowBytes
+            self.exitDataMode()
+        self._endSession()
+        self._dirty = []
+        
+        
+    def _clip(self, x, y, width, height):
+        """
+        clip rectangle to the display or to the current band of the framebuffer,
+        returns None if nothing is left
+        """
+        top = 0
+        bottom = self.height
+        if self._fb is not None:
+            top = self._bandY
+            bottom = min(self._bandY + self._bandHeight, self.height)
+        if x < 0:
+            width += x
+            x = 0
+        if y < top:
+            height -= top - y
+            y = top
+        if x + width > self.width:
+            width = self.width - x
+        if y + height > bottom:
+            height = bottom - y
+        if width <= 0 or height <= 0:
+            return None
+        return x, y, width, height
+        
+        
+    def _fillPattern(self, colour):
+        """
+        returns the preallocated fill buffer filled with a converted 16 bit colour
+        """
+        if colour != self._fillColour:
+            view = self._fillView
+            view[0] = colour >> 8
+            view[1] = colour & 0xFF
+            filled = 2
+            while filled < len(view):
+                count = min(filled, len(view) - filled)
+                view[filled:filled + count] = view[:count]
+                filled += count
+            self._fillColour = colour
+        return self._fillView
+    
+    
+    def _fillArea(self, x, y, width, height, colour):
+        """
+        fill rectangle in panel coordinates with converted 16 bit colour
+        """
+        area = self._clip(x, y, width, height)
+        if area is None:
+            return
+        x, y, width, height = area
+        if self._displayList is not None:
+            self._record(self.FILL, x, y, width, height, colour)
+            return
+        if self._fb is None:
+            pattern = self._fillPattern(colour)
+            chunk = len(pattern)
+            remaining = width * height * 2
+            self.setWindow(x, y, x + width - 1, y + height - 1)
+            self.enterDataMode()
+            while remaining > chunk:
+                self.spi.write(pattern)
+                remaining -= chunk
+            self.spi.write(pattern[:remaining])
+            self.exitDataMode()
+            return
+        if self.canvas is not None:
+            framebuf.FrameBuffer.fill_rect(self.canvas, x, y - self._bandY, width, height,
+                                           ((colour & 0xFF) << 8) | (colour >> 8))
+            self._markDirty(x, y, x + width - 1, y + height - 1)
+            return
+        fb = self._fb
+        rowBytes = self.width * 2
+        start = ((y - self._bandY) * self.width + x) * 2
+        if width == 1:
+            hColour = colour >> 8
+            lColour = colour & 0xFF
+            for iY in range(height):
+                fb[start] = hColour
+                fb[start + 1] = lColour
+                start += rowBytes
+        else:
+            pattern = self._fillPattern(colour)
+            chunk = len(pattern)
+            view = self._fbView
+            if width == self.width:
+                # whole rows are one contiguous block of the framebuffer
+                length = height * rowBytes
+                height = 1
+            else:
+                length = width * 2
+            for iY in range(height):
+                offset = start
+                end = start + length
+                while offset < end:
+                    count = min(chunk, end - offset)
+                    view[offset:offset + count] = pattern[:count]
+                    offset += count
+                start += rowBytes
+            height = area[3]
+        self._markDirty(x, y, x + width - 1, y + height - 1)
+        
+        
+    def _blitArea(self, x, y, width, height, buf):
+        """
+        copy RGB565 pixel data in panel coordinates onto the display or into the framebuffer
+        """
+        area = self._clip(x, y, width, height)
+        if area is None:
+            return
+        cx, cy, cw, ch = area
+        srcRow = width * 2
+        part = (memoryview(buf), (cy - y) * srcRow + (cx - x) * 2, srcRow, cw)
+        if self._displayList is not None:
+            self._record(self.BLIT, cx, cy, cw, ch, part)
+            return
+        self._blitParts(cx, cy, cw, ch, [part])
+        
+        
+    def _blitParts(self, x, y, width, height, parts):
+        """
+        copy side by side pixel buffers into one window, already clipped
+        parts - list of (memoryview, first byte, bytes per row, width in pixels)
+        """
+        if self._fb is None:
+            self.setWindow(x, y, x + width - 1, y + height - 1)
+            self.enterDataMode()
+            if len(parts) == 1 and parts[0][2] == width * 2:
+                src, start, srcRow, partWidth = parts[0]
+                self.spi.write(src[start:start + height * srcRow])
+            else:
+                for iY in range(height):
+                    for src, start, srcRow, partWidth in parts:
+                        start += iY * srcRow
+                        self.spi.write(src[start:start + partWidth * 2])
+            self.exitDataMode()
+            return
+        rowBytes = self.width * 2
+        left = x
+        for src, srcStart, srcRow, partWidth in parts:
+            start = ((y - self._bandY) * self.width + left) * 2
+            for iY in range(height):
+                self._fbView[start:start + partWidth * 2] = src[srcStart:srcStart + partWidth * 2]
+                start += rowBytes
+                srcStart += srcRow
+            left += partWidth
+        self._markDirty(x, y, x + width - 1, y + height - 1)
+        
+        
+    def beginDisplayList(self):
+        """
+        record drawing operations in a display list instead of sending them immediately,
+        buffers passed to blit must not be changed until commit() is called
+        """
+        if self._displayList is None:
+            self._displayList = []
+            
+            
+    def commit(self):
+        """
+        execute all recorded drawing operations inside one chip select session,
+        recording continues with an empty display list
+        """
+        operations = self._displayList
+        if operations is None:
+            return
+        self._displayList = None
+        self._beginSession()
+        try:
+            for kind, x, y, width, height, data in operations:
+                if kind == self.FILL:
+                    self._fillArea(x, y, width, height, data)
+                else:
+                    self._blitParts(x, y, width, height, data)
+        finally:
+            self._endSession()
+            self._displayList = []
+            
+            
+    def endDisplayList(self):
+        """
+        execute recorded drawing operations and draw immediately again
+        """
+        self.commit()
+        self._displayList = None
+        
+        
+    def _record(self, kind, x, y, width, height, data):
+        """
+        add drawing operation to the display list, operations which are completely
+        overdrawn are removed and adjacent operations are merged into one window
+        """
+        operations = self._displayList
+        x1 = x + width - 1
+        y1 = y + height - 1
+        index = 0
+        while index < len(operations):
+            op = operations[index]
+            if op[1] >= x and op[2] >= y and op[1] + op[3] - 1 <= x1 and op[2] + op[4] - 1 <= y1:
+                operations.pop(index)
+            else:
+                index += 1
+        if operations:
+            last = operations[-1]
+            if kind == self.FILL and last[0] == self.FILL and last[5] == data:
+                lastX1 = last[1] + last[3] - 1
+                lastY1 = last[2] + last[4] - 1
+                if x >= last[1] and y >= last[2] and x1 <= lastX1 and y1 <= lastY1:
+                    return
+                if last[1] == x and lastX1 == x1 and y <= lastY1 + 1 and last[2] <= y1 + 1:
+                    top = min(y, last[2])
+                    last[2] = top
+                    last[4] = max(y1, lastY1) - top + 1
+                    return
+                if last[2] == y and lastY1 == y1 and x <= lastX1 + 1 and last[1] <= x1 + 1:
+                    left = min(x, last[1])
+                    last[1] = left
+                    last[3] = max(x1, lastX1) - left + 1
+                    return
+            elif kind == self.BLIT and last[0] == self.BLIT and last[2] == y and last[4] == height \
+                    and last[1] + last[3] == x:
+                last[3] += width
+                last[5].append(data)
+                return
+        if kind == self.BLIT:
+            data = [data]
+        operations.append([kind, x, y, width, height, data])
+        
+        
     def fillRec(self, x, y, width, height, colour):
         """
         draw a filled rectangle
@@ -207,14 +707,7 @@ class ST7735:
         height - height of rectangle
         colour - rgb tuple
         """
-        conv_col = self.convertColour(colour)
-        hColour = (conv_col >> 8) % 256
-        lColour = conv_col % 256
-        self.setWindow(x, y, x + width - 1, y + height - 1)
-        self.enterDataMode()
-        for iX in range(height, 0, -1):
-            self.spi.write(bytearray([hColour, lColour]*width))
-        self.exitDataMode()
+        self._fillArea(x, y, width, height, self.convertColour(colour))
     
     
     def fill(self, colour):
@@ -238,9 +731,29 @@ class ST7735:
         y - y-coordinate
         colour - rgb tuple
         """
-        self.setWindow(x + self.offset[0], y + self.offset[1], x+1, y+1)
-        conv_col = self.convertColour(colour)
-        self.send(self.RAMWR, [conv_col >> 8, conv_col])
+        self._fillArea(x + self.offset[0], y + self.offset[1], 1, 1, self.convertColour(colour))
+
+
+    def hline(self, x, y, length, colour):
+        """
+        draw horizontal line on display
+        x - x-coordinate of left end
+        y - y-coordinate of the line
+        length - length of line in pixels
+        colour - rgb tuple
+        """
+        self._fillArea(x + self.offset[0], y + self.offset[1], length, 1, self.convertColour(colour))
+        
+        
+    def vline(self, x, y, length, colour):
+        """
+        draw vertical line on display
+        x - x-coordinate of the line
+        y - y-coordinate of upper end
+        length - length of line in pixels
+        colour - rgb tuple
+        """
+        self._fillArea(x + self.offset[0], y + self.offset[1], 1, length, self.convertColour(colour))
 
 
     def fillCircle(self, x, y, radius, colour):
@@ -252,12 +765,27 @@ class ST7735:
         colour - rgb tuple
         """
         conv_col = self.convertColour(colour)
-        for y1 in range(-radius, radius+1):
-            y1_squared = y1**2
-            for x1 in range(-radius, radius+1):
-                if x1**2 + y1_squared <= radius**2:
-                    self.setWindow(x+x1 + self.offset[0], y+y1 + self.offset[1], x+x1+1, y+y1+1)
-                    self.send(self.RAMWR, [conv_col >> 8, conv_col])
+        x += self.offset[0]
+        y += self.offset[1]
+        radius_squared = radius * radius
+        halfWidth = radius
+        # rows with the same width are filled as one rectangle
+        startRow = 0
+        for row in range(radius + 2):
+            newWidth = halfWidth
+            if row <= radius:
+                while newWidth * newWidth + row * row > radius_squared:
+                    newWidth -= 1
+            if row > radius or newWidth != halfWidth:
+                if row > startRow:
+                    width = 2 * halfWidth + 1
+                    if startRow == 0:
+                        self._fillArea(x - halfWidth, y - row + 1, width, 2 * row - 1, conv_col)
+                    else:
+                        self._fillArea(x - halfWidth, y + startRow, width, row - startRow, conv_col)
+                        self._fillArea(x - halfWidth, y - row + 1, width, row - startRow, conv_col)
+                startRow = row
+                halfWidth = newWidth
         
         
     def drawLine(self, x1, y1, x2, y2, colour):
@@ -270,31 +798,44 @@ class ST7735:
         colour - rgb tuple
         """
         conv_col = self.convertColour(colour)
+        x1 += self.offset[0]
+        y1 += self.offset[1]
+        x2 += self.offset[0]
+        y2 += self.offset[1]
         dx = abs(x2 - x1)
         dy = abs(y2 - y1)
         sx = 1 if x1 < x2 else -1
         sy = 1 if y1 < y2 else -1
-        if dx > dy:
-            dx, dy = dy, dx
-            interchange = True
+        if dx >= dy:
+            # mostly horizontal, every row of the line is one horizontal run
+            err = dx // 2
+            y = y1
+            runStart = x1
+            x = x1
+            for i in range(dx):
+                err -= dy
+                if err < 0:
+                    self._fillArea(min(runStart, x), y, abs(x - runStart) + 1, 1, conv_col)
+                    y += sy
+                    err += dx
+                    runStart = x + sx
+                x += sx
+            self._fillArea(min(runStart, x), y, abs(x - runStart) + 1, 1, conv_col)
         else:
-            interchange = False
-        p = 2*dy - dx
-        x, y = x1, y1
-        for i in range(dx + 1):
-            self.setWindow(x + self.offset[0], y + self.offset[1], x+1, y+1)
-            self.send(self.RAMWR, [conv_col >> 8, conv_col])
-            while p >= 0:
-                if interchange:
+            # mostly vertical, every column of the line is one vertical run
+            err = dy // 2
+            x = x1
+            runStart = y1
+            y = y1
+            for i in range(dy):
+                err -= dx
+                if err < 0:
+                    self._fillArea(x, min(runStart, y), 1, abs(y - runStart) + 1, conv_col)
                     x += sx
-                else:
-                    y += sy
-                p -= 2*dx
-            if interchange:
+                    err += dy
+                    runStart = y + sy
                 y += sy
-            else:
-                x += sx
-            p += 2*dy
+            self._fillArea(x, min(runStart, y), 1, abs(y - runStart) + 1, conv_col)
 
 
     def drawCircle(self, x_cent, y_cent, radius, colour):
@@ -306,39 +847,209 @@ class ST7735:
         colour - rgb tuple
         """
         conv_col = self.convertColour(colour)
-        def plotCirclePoints(cx, cy, x, y):
-            self.setWindow(cx + x + self.offset[0], cy + y + self.offset[1], cx + x + 1, cy + y + 1)
-            self.send(self.RAMWR, [conv_col >> 8, conv_col])
-            self.setWindow(cx - x + self.offset[0], cy + y + self.offset[1], cx - x + 1, cy + y + 1)
-            self.send(self.RAMWR, [conv_col >> 8, conv_col])
-            self.setWindow(cx + x + self.offset[0], cy - y + self.offset[1], cx + x + 1, cy - y + 1)
-            self.send(self.RAMWR, [conv_col >> 8, conv_col])
-            self.setWindow(cx - x + self.offset[0], cy - y + self.offset[1], cx - x + 1, cy - y + 1)
-            self.send(self.RAMWR, [conv_col >> 8, conv_col])
-            if x != y:
-                self.setWindow(cx + y + self.offset[0], cy + x + self.offset[1], cx + y + 1, cy + x + 1)
-                self.send(self.RAMWR, [conv_col >> 8, conv_col])
-                self.setWindow(cx - y + self.offset[0], cy + x + self.offset[1], cx - y + 1, cy + x + 1)
-                self.send(self.RAMWR, [conv_col >> 8, conv_col])
-                self.setWindow(cx + y + self.offset[0], cy - x + self.offset[1], cx + y + 1, cy - x + 1)
-                self.send(self.RAMWR, [conv_col >> 8, conv_col])
-                self.setWindow(cx - y + self.offset[0], cy - x + self.offset[1], cx - y + 1, cy - x + 1)
-                self.send(self.RAMWR, [conv_col >> 8, conv_col])
+        cx = x_cent + self.offset[0]
+        cy = y_cent + self.offset[1]
+        def plotCircleRuns(x, yStart, yEnd):
+            # points of one octant with the same x form a run, mirrored into all octants
+            length = yEnd - yStart + 1
+            self._fillArea(cx + x, cy + yStart, 1, length, conv_col)
+            self._fillArea(cx - x, cy + yStart, 1, length, conv_col)
+            self._fillArea(cx + x, cy - yEnd, 1, length, conv_col)
+            self._fillArea(cx - x, cy - yEnd, 1, length, conv_col)
+            self._fillArea(cx + yStart, cy + x, length, 1, conv_col)
+            self._fillArea(cx - yEnd, cy + x, length, 1, conv_col)
+            self._fillArea(cx + yStart, cy - x, length, 1, conv_col)
+            self._fillArea(cx - yEnd, cy - x, length, 1, conv_col)
+        if radius == 0:
+            self._fillArea(cx, cy, 1, 1, conv_col)
+            return
         x = radius
         y = 0
         p = 1 - radius
-        plotCirclePoints(x_cent, y_cent, x, y)
-        if radius == 0:
-            return
-        plotCirclePoints(x_cent, y_cent, radius, 0)
+        runStart = 0
         while x > y:
             y += 1
             if p <= 0:
                 p = p + 2*y + 1
             else:
+                plotCircleRuns(x, runStart, y - 1)
+                runStart = y
                 x -= 1
-                p = p + 2*y - 2*x + 1 
-            plotCirclePoints(x_cent, y_cent, x, y)
+                p = p + 2*y - 2*x + 1
+        if x >= runStart:
+            plotCircleRuns(x, runStart, min(x, y))
+            
+            
+    def fillTriangle(self, x0, y0, x1, y1, x2, y2, colour):
+        """
+        draw filled triangle on display
+        x0, y0 - coordinates of first corner
+        x1, y1 - coordinates of second corner
+        x2, y2 - coordinates of third corner
+        colour - rgb tuple
+        """
+        self.fillPolygon([(x0, y0), (x1, y1), (x2, y2)], colour)
+        
+        
+    def fillPolygon(self, points, colour):
+        """
+        draw filled polygon on display, self-intersecting polygons are filled with the even-odd rule
+        points - list of (x, y) tuples of the corners
+        colour - rgb tuple
+        """
+        if not points:
+            return
+        conv_col = self.convertColour(colour)
+        ox, oy = self.offset
+        edges = []
+        count = len(points)
+        for i in range(count):
+            xa, ya = points[i]
+            xb, yb = points[(i + 1) % count]
+            if ya == yb:
+                continue
+            if ya > yb:
+                xa, ya, xb, yb = xb, yb, xa, ya
+            edges.append((xa, ya, xb, yb))
+        top = min(point[1] for point in points)
+        bottom = max(point[1] for point in points)
+        if not edges:
+            left = min(point[0] for point in points)
+            right = max(point[0] for point in points)
+            self._fillArea(left + ox, top + oy, right - left + 1, 1, conv_col)
+            return
+        # consecutive rows with identical spans are filled as one rectangle
+        spans = None
+        startRow = top
+        for y in range(top, bottom + 2):
+            newSpans = None
+            if y <= bottom:
+                crossings = []
+                for xa, ya, xb, yb in edges:
+                    if (ya <= y < yb) if y < bottom else (ya < y <= yb):
+                        den = yb - ya
+                        crossings.append(xa + (2 * (y - ya) * (xb - xa) + den) // (2 * den))
+                crossings.sort()
+                newSpans = crossings
+            if newSpans != spans:
+                if spans:
+                    for i in range(0, len(spans) - 1, 2):
+                        self._fillArea(spans[i] + ox, startRow + oy, spans[i + 1] - spans[i] + 1, y - startRow, conv_col)
+                spans = newSpans
+                startRow = y
+
+
+    def blit(self, x, y, width, height, buf):
+        """
+        draw RGB565 pixel data onto the display, the buffer is sent without copying it
+        x - left upper corner x-coordinate
+        y - left upper corner y-coordinate
+        width - width of image
+        height - height of image
+        buf - bytearray or memoryview with 2 bytes per pixel (high byte first), row by row
+        """
+        self._blitArea(x + self.offset[0], y + self.offset[1], width, height, buf)
+        
+        
+    def drawImage(self, path, x = 0, y = 0, width = 128, bufferSize = 2048):
+        """
+        draw image file from flash, the file is read in chunks of rows so the RAM usage stays constant
+        path - 16 or 24 bit BMP file or raw RGB565 file (2 bytes per pixel, high byte first)
+        x - left upper corner x-coordinate
+        y - left upper corner y-coordinate
+        width - width of a raw RGB565 image, BMP files contain their own size
+        bufferSize - size of the buffer for converted pixel data in bytes
+        """
+        with open(path, "rb") as file:
+            if file.read(2) == b"BM":
+                self._drawBMP(file, x, y, bufferSize)
+            else:
+                file.seek(0)
+                self._drawRaw(file, x, y, width, bufferSize)
+                
+                
+    def _drawRaw(self, file, x, y, width, bufferSize):
+        """
+        stream raw RGB565 file onto the display
+        """
+        rowBytes = width * 2
+        rows = max(1, bufferSize // rowBytes)
+        buf = bytearray(rows * rowBytes)
+        view = memoryview(buf)
+        while True:
+            count = file.readinto(buf)
+            if not count:
+                break
+            rows = count // rowBytes
+            if rows == 0:
+                break
+            chunk = view[:rows * rowBytes]
+            if self._displayList is not None:
+                chunk = bytes(chunk)
+            self.blit(x, y, width, rows, chunk)
+            y += rows
+            
+            
+    def _drawBMP(self, file, x, y, bufferSize):
+        """
+        stream 16 bit (RGB555 or RGB565) or 24 bit BMP file onto the display
+        """
+        header = bytearray(64)
+        file.readinto(memoryview(header)[2:])
+        dataOffset, = struct.unpack_from("<I", header, 10)
+        width, height, planes, depth, compression = struct.unpack_from("<iiHHI", header, 18)
+        if depth not in (16, 24) or compression not in (0, 3):
+            raise ValueError("Only uncompressed 16 or 24 bit BMP files are supported!")
+        rgb565 = depth == 16 and compression == 3 and struct.unpack_from("<I", header, 58)[0] == 0x07E0
+        # rows are stored bottom-up unless the height is negative
+        topDown = height < 0
+        height = abs(height)
+        fileRowBytes = (width * depth // 8 + 3) & ~3
+        rowBytes = width * 2
+        rows = max(1, min(height, bufferSize // rowBytes))
+        inBuf = bytearray(rows * fileRowBytes)
+        outBuf = bytearray(rows * rowBytes)
+        inView = memoryview(inBuf)
+        outView = memoryview(outBuf)
+        for top in range(0, height, rows):
+            count = min(rows, height - top)
+            fileRow = top if topDown else height - top - count
+            file.seek(dataOffset + fileRow * fileRowBytes)
+            file.readinto(inView[:count * fileRowBytes])
+            for row in range(count):
+                outRow = row if topDown else count - 1 - row
+                self._convertBMPRow(inBuf, row * fileRowBytes, outBuf, outRow * rowBytes, width, depth, rgb565)
+            chunk = outView[:count * rowBytes]
+            if self._displayList is not None:
+                chunk = bytes(chunk)
+            self.blit(x, y + top, width, count, chunk)
+            
+            
+    def _convertBMPRow(self, src, srcIndex, dst, dstIndex, width, depth, rgb565):
+        """
+        convert one row of BMP pixels into RGB565 in the colour order of the display
+        """
+        swap = self.colourMode == "bgr"
+        for pixel in range(width):
+            if depth == 24:
+                b = src[srcIndex]
+                g = src[srcIndex + 1]
+                r = src[srcIndex + 2]
+                srcIndex += 3
+                if swap:
+                    r, b = b, r
+                colour = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            else:
+                colour = src[srcIndex] | (src[srcIndex + 1] << 8)
+                srcIndex += 2
+                if not rgb565:
+                    green = (colour >> 5) & 0x1F
+                    colour = ((colour & 0x7C00) << 1) | (((green << 1) | (green >> 4)) << 5) | (colour & 0x1F)
+                if swap:
+                    colour = ((colour & 0x1F) << 11) | (colour & 0x07E0) | (colour >> 11)
+            dst[dstIndex] = colour >> 8
+            dst[dstIndex + 1] = colour & 0xFF
+            dstIndex += 2
 
 
     def turnOff(self):
@@ -355,44 +1066,418 @@ class ST7735:
         self.send(self.DISPON, [])
     
     
-    def print(self, text, x, y, textColour, bgColour, size=1):
+    def setScrollArea(self, top = 0, height = 160):
+        """
+        define the rows which are scrolled by hardware, rows above and below stay fixed
+        top - first row of the scrolling area
+        height - number of rows of the scrolling area
+        """
+        topFixed = top + self.offset[1]
+        bottomFixed = self.MEMORY_ROWS - topFixed - height
+        self.send(self.VSCRDEF, bytes([topFixed >> 8, topFixed & 0xFF, height >> 8, height & 0xFF,
+                                       bottomFixed >> 8, bottomFixed & 0xFF]))
+        self._scrollTop = topFixed
+        self._scrollHeight = height
+        self.scroll(0)
+        
+        
+    def scroll(self, lines):
+        """
+        scroll the scrolling area, the row at offset lines of the area is shown at its top
+        lines - scroll offset in rows
+        """
+        self._scrollOffset = lines % self._scrollHeight
+        start = self._scrollTop + self._scrollOffset
+        self.send(self.VSCRSADD, bytes([start >> 8, start & 0xFF]))
+        
+        
+    def setGlyphCacheSize(self, maxBytes):
+        """
+        set memory budget of the glyph cache used by print
+        maxBytes - maximum size of all cached glyphs in bytes, 0 disables the cache
         """
-        print String on display
+        self.glyphCache.resize(maxBytes)
+        
+        
+    def setFont(self, font):
+        """
+        set font used by print, see module font
+        font - font.Font object
+        """
+        self.font = font
+        
+        
+    def _glyph(self, font, char, size, textColour, bgColour):
+        """
+        returns width and RGB565 buffer of a character, rendered glyphs are taken from the glyph cache
+        """
+        key = (font, char, size, textColour, bgColour)
+        glyph = self.glyphCache.get(key)
+        if glyph is not None:
+            return glyph
+        width, data = font.glyph(char)
+        text = bytes([(textColour >> 8) & 0xFF, textColour & 0xFF])
+        bg = bytes([(bgColour >> 8) & 0xFF, bgColour & 0xFF])
+        rowBytes = width * size * 2
+        buf = bytearray(rowBytes * font.height * size)
+        index = 0
+        for Yindex in range(font.height):
+            rowStart = index
+            page = (Yindex >> 3) * width
+            mask = 1 << (Yindex & 7)
+            for Xindex in range(width):
+                colour = text if data[page + Xindex] & mask else bg
+                for sz2 in range(size):
+                    buf[index:index + 2] = colour
+                    index += 2
+            for sz1 in range(size - 1):
+                buf[index:index + rowBytes] = buf[rowStart:rowStart + rowBytes]
+                index += rowBytes
+        glyph = (width * size, buf)
+        self.glyphCache.put(key, glyph)
+        return glyph
+    
+    
+    def print(self, text, x, y, textColour, bgColour, size=1, font=None):
+        """
+        print String on display, every line of text is sent in one window
         x - x-coordinate of starting point
         y - y-coordinate of starting point
         textColour - rgb tuple for the text colour
         bgColour - rgb tuple for the background colour
         size - size of text
+        font - font.Font object, None for the font set with setFont
         """
+        if font is None:
+            font = self.font
         conv_textCol = self.convertColour(textColour)
         conv_bgCol = self.convertColour(bgColour)
-        hTextCol = (conv_textCol >> 8) % 256
-        lTextCol = conv_textCol % 256
-        hBgCol = (conv_bgCol >> 8) % 256
-        lBgCol = conv_bgCol % 256
-        
-        for stringPos in range(len(text)):
-            charAtIndex = ord(text[stringPos])
-            if charAtIndex < 20: unicode = self.fontOne[charAtIndex]
-            elif charAtIndex < 40: unicode = self.fontTwo[charAtIndex - 20]
-            elif charAtIndex < 60: unicode = self.fontThree[charAtIndex - 40]
-            elif charAtIndex < 80: unicode = self.fontFour[charAtIndex - 60]
-            elif charAtIndex < 100: unicode = self.fontFive[charAtIndex - 80]
-            elif charAtIndex < 120: unicode = self.fontSix[charAtIndex - 100]
-            elif charAtIndex < 140: unicode = self.fontSeven[charAtIndex - 120]
+        lineHeight = font.height * size
+        
+        for line in text.split("\n"):
+            glyphs = [self._glyph(font, char, size, conv_textCol, conv_bgCol) for char in line]
+            lineWidth = 0
+            for width, buf in glyphs:
+                lineWidth += width
+            if self._clip(x, y, lineWidth, lineHeight) != (x, y, lineWidth, lineHeight) or self._displayList is not None:
+                # clipped or recorded line, copy glyph by glyph
+                left = x
+                for width, buf in glyphs:
+                    self._blitArea(left, y, width, lineHeight, buf)
+                    left += width
+            elif glyphs:
+                self._blitParts(x, y, lineWidth, lineHeight, [(memoryview(buf), 0, width * 2, width) for width, buf in glyphs])
+            y += lineHeight
+
+
+class Canvas(framebuf.FrameBuffer):
+    """
+    framebuf.RGB565 view of the framebuffer of ST7735, the drawing methods are
+    the native ones of framebuf and mark the changed region for flush()
+    """
+    
+    def __init__(self, tft):
+        """
+        tft - ST7735 display in framebuffer mode
+        """
+        super().__init__(tft._fb, tft.width, tft._bandHeight, framebuf.RGB565)
+        self._tft = tft
+        
+        
+    def _changed(self, x0, y0, x1, y1):
+        """
+        mark region in panel coordinates as changed
+        """
+        tft = self._tft
+        if x0 < 0: x0 = 0
+        if y0 < tft._bandY: y0 = tft._bandY
+        if x1 >= tft.width: x1 = tft.width - 1
+        if y1 >= tft._bandY + tft._bandHeight: y1 = tft._bandY + tft._bandHeight - 1
+        if x0 <= x1 and y0 <= y1:
+            tft._markDirty(x0, y0, x1, y1)
             
-            self.setWindow(x + stringPos * 5 * size, y, x + stringPos * 5 * size + 5 * size - 1, y + 5 * size -1)
-            self.enterDataMode()
             
-            for Yindex in range(5):
-                for sz1 in range(size):
-                    for Xindex in range(5):
-                        colsel = unicode & (1 << (Yindex + Xindex * 5))
-                        for sz2 in range(size):
-                            if colsel != 0:
-                                self.spi.write(bytearray([hTextCol]))
-                                self.spi.write(bytearray([lTextCol]))
-                            else:
-                                self.spi.write(bytearray([hBgCol]))
-                                self.spi.write(bytearray([lBgCol]))
-            self.exitDataMode()
+    def pixel(self, x, y, c = None):
+        if c is None:
+            return super().pixel(x, y - self._tft._bandY)
+        super().pixel(x, y - self._tft._bandY, c)
+        self._changed(x, y, x, y)
+        
+        
+    def fill(self, c):
+        super().fill(c)
+        self._changed(0, self._tft._bandY, self._tft.width - 1, self._tft._bandY + self._tft._bandHeight - 1)
+        
+        
+    def fill_rect(self, x, y, w, h, c):
+        super().fill_rect(x, y - self._tft._bandY, w, h, c)
+        self._changed(x, y, x + w - 1, y + h - 1)
+        
+        
+    def rect(self, x, y, w, h, c, f = False):
+        super().rect(x, y - self._tft._bandY, w, h, c, f)
+        self._changed(x, y, x + w - 1, y + h - 1)
+        
+        
+    def hline(self, x, y, w, c):
+        super().hline(x, y - self._tft._bandY, w, c)
+        self._changed(x, y, x + w - 1, y)
+        
+        
+    def vline(self, x, y, h, c):
+        super().vline(x, y - self._tft._bandY, h, c)
+        self._changed(x, y, x, y + h - 1)
+        
+        
+    def line(self, x1, y1, x2, y2, c):
+        bandY = self._tft._bandY
+        super().line(x1, y1 - bandY, x2, y2 - bandY, c)
+        self._changed(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        
+        
+    def ellipse(self, x, y, xr, yr, c, f = False, m = 0xF):
+        super().ellipse(x, y - self._tft._bandY, xr, yr, c, f, m)
+        self._changed(x - xr, y - yr, x + xr, y + yr)
+        
+        
+    def poly(self, x, y, coords, c, f = False):
+        super().poly(x, y - self._tft._bandY, coords, c, f)
+        if len(coords) < 2:
+            return
+        # coords is an array of x, y pairs relative to x, y
+        x0 = x1 = coords[0]
+        y0 = y1 = coords[1]
+        for i in range(2, len(coords) - 1, 2):
+            px = coords[i]
+            py = coords[i + 1]
+            if px < x0: x0 = px
+            elif px > x1: x1 = px
+            if py < y0: y0 = py
+            elif py > y1: y1 = py
+        self._changed(x + x0, y + y0, x + x1, y + y1)
+        
+        
+    def text(self, s, x, y, c = 1):
+        super().text(s, x, y - self._tft._bandY, c)
+        self._changed(x, y, x + 8 * len(s) - 1, y + 7)
+        
+        
+    def blit(self, fbuf, x, y, key = -1, palette = None):
+        if palette is None:
+            super().blit(fbuf, x, y - self._tft._bandY, key)
+        else:
+            super().blit(fbuf, x, y - self._tft._bandY, key, palette)
+        if isinstance(fbuf, tuple):
+            self._changed(x, y, x + fbuf[1] - 1, y + fbuf[2] - 1)
+        else:
+            # the size of a FrameBuffer is unknown, mark everything right of and below x, y
+            self._changed(x, y, self._tft.width - 1, self._tft.height - 1)
+            
+            
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self._changed(0, self._tft._bandY, self._tft.width - 1, self._tft._bandY + self._tft._bandHeight - 1)
+
+
+class GlyphCache:
+    """
+    least recently used cache of rendered glyphs with a limit in bytes,
+    entries are (width, buffer) tuples
+    """
+    
+    def __init__(self, maxBytes = 4096):
+        """
+        maxBytes - maximum size of all cached glyphs in bytes
+        """
+        self.maxBytes = maxBytes
+        self.size = 0
+        self._entries = OrderedDict()
+        
+        
+    def get(self, key):
+        """
+        returns cached glyph and marks it as recently used, None if not cached
+        """
+        glyph = self._entries.pop(key, None)
+        if glyph is not None:
+            self._entries[key] = glyph
+        return glyph
+    
+    
+    def put(self, key, glyph):
+        """
+        add glyph to the cache, least recently used glyphs are removed if the limit is exceeded
+        """
+        if len(glyph[1]) > self.maxBytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old[1])
+        self._entries[key] = glyph
+        self.size += len(glyph[1])
+        self._evict()
+        
+        
+    def resize(self, maxBytes):
+        """
+        change the limit of the cache
+        """
+        self.maxBytes = maxBytes
+        self._evict()
+        
+        
+    def clear(self):
+        """
+        remove all glyphs from the cache
+        """
+        self._entries = OrderedDict()
+        self.size = 0
+        
+        
+    def _evict(self):
+        """
+        remove least recently used glyphs until the cache fits into its limit
+        """
+        while self.size > self.maxBytes and self._entries:
+            self.size -= len(self._entries.pop(next(iter(self._entries)))[1])
+
+
+class Terminal:
+    """
+    text console which uses the hardware scrolling of the display,
+    only the new line is drawn when the text scrolls up
+    """
+    
+    def __init__(self, tft, textColour = (255, 255, 255), bgColour = (0, 0, 0), size = 1, top = 0, height = 160, font = None):
+        """
+        tft - initialized ST7735 display
+        textColour - rgb tuple for the text colour
+        bgColour - rgb tuple for the background colour
+        size - size of text
+        top - first row of the console
+        height - height of the console in rows
+        font - monospaced font.Font object, None for the font of the display
+        """
+        self.tft = tft
+        self.font = font if font is not None else tft.font
+        self.textColour = tft.convertColour(textColour)
+        self.bgColour = tft.convertColour(bgColour)
+        self.size = size
+        self.lineHeight = (self.font.height + 1) * size
+        self.charWidth = self.font.width * size
+        self.columns = 128 // self.charWidth
+        self.rows = height // self.lineHeight
+        self.top = top
+        self._firstLine = 0
+        self._row = 0
+        self._column = 0
+        tft.setScrollArea(top, self.rows * self.lineHeight)
+        self.clear()
+        
+        
+    def _lineY(self, row):
+        """
+        returns y-coordinate in display memory of a row of the console
+        """
+        return self.top + self.tft.offset[1] + ((self._firstLine + row) % self.rows) * self.lineHeight
+    
+    
+    def clear(self):
+        """
+        clear console and move cursor to the first line
+        """
+        self._firstLine = 0
+        self._row = 0
+        self._column = 0
+        self.tft.fillRec(self.tft.offset[0], self.top + self.tft.offset[1], 128, self.rows * self.lineHeight, self.bgColour)
+        self.tft.flush()
+        self.tft.scroll(0)
+        
+        
+    def newLine(self):
+        """
+        move cursor to the next line, scrolls the console if the cursor is in the last line
+        """
+        self._column = 0
+        if self._row < self.rows - 1:
+            self._row += 1
+            return
+        self._firstLine = (self._firstLine + 1) % self.rows
+        self.tft.fillRec(self.tft.offset[0], self._lineY(self._row), 128, self.lineHeight, self.bgColour)
+        self.tft.flush()
+        self.tft.scroll(self._firstLine * self.lineHeight)
+        
+        
+    def write(self, text):
+        """
+        write text at the cursor position, \n starts a new line and long lines are wrapped
+        """
+        lines = text.split("\n")
+        for index in range(len(lines)):
+            if index:
+                self.newLine()
+            line = lines[index]
+            while line:
+                if self._column >= self.columns:
+                    self.newLine()
+                part = line[:self.columns - self._column]
+                line = line[len(part):]
+                self.tft.print(part, self.tft.offset[0] + self._column * self.charWidth, self._lineY(self._row),
+                               self.textColour, self.bgColour, self.size, self.font)
+                self._column += len(part)
+        self.tft.flush()
+        
+        
+class StripChart:
+    """
+    strip chart which adds every value as a new row at the bottom and scrolls the older values up by hardware
+    """
+    
+    def __init__(self, tft, minValue = 0, maxValue = 100, colour = (0, 255, 0), bgColour = (0, 0, 0), top = 0, height = 160):
+        """
+        tft - initialized ST7735 display
+        minValue - value shown at the left side
+        maxValue - value shown at the right side
+        colour - rgb tuple for the plot colour
+        bgColour - rgb tuple for the background colour
+        top - first row of the chart
+        height - height of the chart in rows
+        """
+        if maxValue == minValue:
+            raise ValueError("maxValue must differ from minValue!")
+        self.tft = tft
+        self.minValue = minValue
+        self.maxValue = maxValue
+        self.colour = tft.convertColour(colour)
+        self.bgColour = tft.convertColour(bgColour)
+        self.top = top
+        self.height = height
+        self._offset = 0
+        self._last = None
+        tft.setScrollArea(top, height)
+        tft.fillRec(tft.offset[0], top + tft.offset[1], 128, height, self.bgColour)
+        tft.flush()
+        
+        
+    def add(self, value):
+        """
+        add value to the chart, it is connected to the previous value
+        """
+        if value < self.minValue:
+            value = self.minValue
+        elif value > self.maxValue:
+            value = self.maxValue
+        x = int((value - self.minValue) * 127 // (self.maxValue - self.minValue))
+        left = right = x
+        if self._last is not None:
+            left = min(x, self._last)
+            right = max(x, self._last)
+        self._last = x
+        # the row shown at the top is overwritten and becomes the bottom row after scrolling
+        y = self.top + self.tft.offset[1] + self._offset
+        ox = self.tft.offset[0]
+        self.tft.fillRec(ox, y, 128, 1, self.bgColour)
+        self.tft.fillRec(ox + left, y, right - left + 1, 1, self.colour)
+        self.tft.flush()
+        self._offset = (self._offset + 1) % self.height
+        self.tft.scroll(self._offset)
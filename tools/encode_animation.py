@@ -0,0 +1,105 @@
+"""
+Encoder for the RGB LED matrix animation format, runs on a PC.
+
+    python encode_animation.py input.gif output.anim [--duration 100] [--serpentine]
+
+Every frame of the input (animated GIF or any image Pillow can read, or
+several images) is scaled to the matrix size and stored in the order of
+the pixel indices. Play the file with RGB_Matrix.playAnimation().
+
+File format (all numbers little endian):
+    header   "RA", pixel count (16 bit), palette size (16 bit), frame count (16 bit)
+    palette  palette size * 3 bytes RGB
+    frames   type (8 bit), duration in ms (16 bit), payload length (16 bit), payload
+
+Frame types:
+    0 FULL_RGB       3 bytes RGB per pixel
+    1 FULL_INDEXED   1 byte palette index per pixel
+    2 DELTA_RGB      changed pixels only, 4 bytes each: pixel index, R, G, B
+    3 DELTA_INDEXED  changed pixels only, 2 bytes each: pixel index, palette index
+The first frame is always a full frame, the encoder picks the smallest
+type for every other frame.
+"""
+import argparse
+import struct
+
+FULL_RGB = 0
+FULL_INDEXED = 1
+DELTA_RGB = 2
+DELTA_INDEXED = 3
+
+
+def encode(frames, durations):
+    """
+    encode frames into the animation format
+    frames - list of frames, each bytes with 3 bytes RGB per pixel
+    durations - list of frame durations in ms
+    returns animation as bytes
+    """
+    num = len(frames[0]) // 3
+    if num > 256:
+        raise ValueError("at most 256 pixels are supported")
+    colours = sorted({bytes(frame[i:i + 3]) for frame in frames for i in range(0, len(frame), 3)})
+    # a palette is only used if all colours fit into one byte
+    palette = colours if len(colours) <= 256 else []
+    lookup = {colour: i for i, colour in enumerate(palette)}
+    out = bytearray(b"RA" + struct.pack("<HHH", num, len(palette), len(frames)))
+    for colour in palette:
+        out += colour
+    previous = None
+    for frame, duration in zip(frames, durations):
+        frame = bytes(frame)
+        pixels = [frame[i * 3:i * 3 + 3] for i in range(num)]
+        candidates = [(FULL_RGB, frame)]
+        if palette:
+            candidates.append((FULL_INDEXED, bytes(lookup[p] for p in pixels)))
+        if previous is not None:
+            changed = [i for i in range(num) if pixels[i] != previous[i]]
+            candidates.append((DELTA_RGB, b"".join(bytes((i,)) + pixels[i] for i in changed)))
+            if palette:
+                candidates.append((DELTA_INDEXED, b"".join(bytes((i, lookup[pixels[i]])) for i in changed)))
+        kind, payload = min(candidates, key=lambda candidate: len(candidate[1]))
+        out += struct.pack("<BHH", kind, duration, len(payload)) + payload
+        previous = pixels
+    return bytes(out)
+
+
+def load(paths, width, height, duration, serpentine):
+    """
+    read all frames of the images with Pillow and return (frames, durations)
+    """
+    from PIL import Image, ImageSequence
+    frames = []
+    durations = []
+    for path in paths:
+        image = Image.open(path)
+        for frame in ImageSequence.Iterator(image):
+            rgb = frame.convert("RGB").resize((width, height))
+            data = bytearray()
+            for y in range(height):
+                row = range(width - 1, -1, -1) if serpentine and y & 1 else range(width)
+                for x in row:
+                    data += bytes(rgb.getpixel((x, y)))
+            frames.append(bytes(data))
+            durations.append(min(frame.info.get("duration", duration) or duration, 0xFFFF))
+    return frames, durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode images into an RGB LED matrix animation")
+    parser.add_argument("input", nargs="+", help="animated GIF or images, one frame each")
+    parser.add_argument("output", help="animation file to write")
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=100, help="frame duration in ms if the input has none")
+    parser.add_argument("--serpentine", action="store_true", help="every second row is wired right to left")
+    args = parser.parse_args()
+    frames, durations = load(args.input, args.width, args.height, args.duration, args.serpentine)
+    data = encode(frames, durations)
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print("%d frames, %d bytes" % (len(frames), len(data)))
+
+
+if __name__ == "__main__":
+    main()